@@ -0,0 +1,126 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app import models
+
+# Analitik instruktur dari rollup harian (models.CourseDailyStat).
+# Jalur enroll/unenroll/favorit memanggil record() di transaksi yang sama dengan
+# perubahannya: satu UPSERT yang menambah penghitung hari ini (UTC), jadi rollup
+# ikut batal bila transaksinya batal. Deret waktu untuk rentang berapa pun dibaca
+# dari primary key (course_id, day) tanpa menyentuh tabel enrollments.
+# Data lama diisi dengan `python -m app.maintenance backfill-daily-stats`.
+
+METRICS = ("enrollments", "unenrollments", "favorites", "unfavorites")
+INTERVALS = ("day", "week", "month")
+# Batas jumlah titik per kursus dalam satu respons
+MAX_PERIODS = 1000
+
+
+def today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def record(db: Session, course_ids: Iterable[int], metric: str):
+    """Menambah `metric` hari ini sebesar 1 untuk setiap kursus di `course_ids` (tanpa commit)."""
+    rows = [{"course_id": course_id, "day": today(), metric: 1} for course_id in course_ids]
+    if not rows:
+        return
+    statement = sqlite_insert(models.CourseDailyStat).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["course_id", "day"],
+        set_={metric: getattr(models.CourseDailyStat, metric) + statement.excluded[metric]}
+    ))
+
+
+def remove_course(db: Session, course_id: int):
+    db.query(models.CourseDailyStat).filter(
+        models.CourseDailyStat.course_id == course_id
+    ).delete(synchronize_session=False)
+
+
+def backfill(db: Session) -> int:
+    """
+    Mengisi kolom `enrollments` dari Enrollment.enrolled_at. Hanya pendaftaran yang masih
+    ada yang bisa dihitung (unenroll dan favorit tidak punya riwayat waktu), jadi nilai
+    yang sudah lebih besar (dicatat langsung oleh record()) tidak diturunkan.
+    Mengembalikan jumlah baris (kursus, hari) yang dihitung.
+    """
+    result = db.execute(text(
+        "INSERT INTO course_daily_stats (course_id, day, enrollments) "
+        "SELECT course_id, date(enrolled_at), COUNT(*) FROM enrollments "
+        "WHERE course_id IS NOT NULL GROUP BY course_id, date(enrolled_at) "
+        "ON CONFLICT (course_id, day) DO UPDATE "
+        "SET enrollments = max(enrollments, excluded.enrollments)"
+    ))
+    db.commit()
+    return result.rowcount
+
+
+def period_start(day: date, interval: str) -> date:
+    if interval == "week":
+        return day - timedelta(days=day.weekday())  # Senin
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def period_count(start: date, end: date, interval: str) -> int:
+    """Jumlah periode dari `start` sampai `end`, dihitung tanpa membuat daftarnya."""
+    if interval == "month":
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    days = (period_start(end, interval) - period_start(start, interval)).days
+    return days // 7 + 1 if interval == "week" else days + 1
+
+
+def periods(start: date, end: date, interval: str) -> List[date]:
+    # Pemanggil membatasi panjangnya lebih dulu lewat period_count()
+    result, current = [], period_start(start, interval)
+    while current <= end:
+        result.append(current)
+        try:
+            if interval == "day":
+                current += timedelta(days=1)
+            elif interval == "week":
+                current += timedelta(days=7)
+            else:
+                current = (current + timedelta(days=32)).replace(day=1)
+        except OverflowError:
+            # Periode terakhir sebelum date.max
+            break
+    return result
+
+
+def _period_column(interval: str):
+    day = models.CourseDailyStat.day
+    if interval == "week":
+        return func.date(day, "weekday 0", "-6 days")
+    if interval == "month":
+        return func.strftime("%Y-%m-01", day)
+    return func.date(day)
+
+
+def series(db: Session, course_ids: List[int], start: date, end: date, interval: str) -> Dict[int, dict]:
+    """
+    Deret waktu per kursus: {course_id: {period: {metric: jumlah}}}, hanya periode yang
+    ada aktivitasnya. Satu query GROUP BY di atas primary key (course_id, day).
+    """
+    period = _period_column(interval).label("period")
+    rows = db.execute(
+        select(
+            models.CourseDailyStat.course_id, period,
+            *(func.sum(getattr(models.CourseDailyStat, metric)).label(metric) for metric in METRICS)
+        )
+        .where(
+            models.CourseDailyStat.course_id.in_(course_ids),
+            models.CourseDailyStat.day >= start,
+            models.CourseDailyStat.day <= end,
+        )
+        .group_by(models.CourseDailyStat.course_id, period)
+    ).all()
+
+    result = {course_id: {} for course_id in course_ids}
+    for row in rows:
+        result[row.course_id][date.fromisoformat(row.period)] = {metric: getattr(row, metric) for metric in METRICS}
+    return result
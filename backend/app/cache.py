@@ -0,0 +1,219 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Tuple
+from urllib.parse import urlencode
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+# Cache sederhana di dalam proses (per worker).
+# Setiap worker uvicorn punya salinannya sendiri, jadi isi cache harus selalu
+# bisa dibangun ulang dari database dan cukup dibatasi dengan TTL yang pendek.
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Cache LRU berukuran terbatas dengan masa berlaku (TTL) per entri. Thread-safe."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def items(self):
+        # Salinan entri yang masih berlaku, aman dipakai di luar lock
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (expires_at, value) in self._data.items() if expires_at > now]
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ResponseCache:
+    """
+    Cache respons JSON yang sudah diserialisasi (bytes), dengan LRU, TTL, dan tag.
+    Setiap entri diberi tag entitas (mis. "course:12", "courses:list") sehingga
+    endpoint yang mengubah data cukup membuang tag yang terdampak.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Naik setiap kali ada invalidasi; dipakai agar hasil yang dibangun sebelum
+        # sebuah penulisan tidak ikut tersimpan setelah tag-nya dibuang
+        self.generation = 0
+        self._entries = OrderedDict()  # key -> (expires_at, body, tags)
+        self._keys_by_tag = {}         # tag -> set(key)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, body: bytes, tags=(), generation=None):
+        tags = frozenset(tags)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (time.monotonic() + self.ttl, body, tags)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, *tags):
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._discard(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+    def _discard(self, key):
+        # Harus dipanggil saat memegang lock
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+RESPONSE_CACHE_MAXSIZE = int(os.getenv("RESPONSE_CACHE_MAXSIZE", "2048"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+
+# Cache untuk endpoint katalog publik (lihat `cached_json`)
+response_cache = ResponseCache(maxsize=RESPONSE_CACHE_MAXSIZE, ttl=RESPONSE_CACHE_TTL)
+
+_adapters = {}
+
+
+def _adapter_for(response_model):
+    adapter = _adapters.get(response_model)
+    if adapter is None:
+        adapter = _adapters[response_model] = TypeAdapter(response_model)
+    return adapter
+
+
+def validate(response_model, data):
+    """
+    Validasi data (objek ORM) ke model respons. Memanggil ini di dalam fungsi yang
+    memegang Session memastikan semua lazy-load terjadi di sana, bukan saat FastAPI
+    menyerialisasi respons (penting untuk threadpool dan AsyncSession.run_sync).
+    """
+    return _adapter_for(response_model).validate_python(data, from_attributes=True)
+
+
+def json_response(response_model, data) -> Response:
+    """Validasi + serialisasi langsung ke Response (untuk endpoint tanpa cache)."""
+    body = _adapter_for(response_model).dump_json(validate(response_model, data))
+    return Response(content=body, media_type="application/json")
+
+
+def request_key(request: Request) -> str:
+    # Kunci = path + query parameter yang diurutkan, agar ?a=1&b=2 dan ?b=2&a=1 sama
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def cached_json(request: Request, response_model, build: Callable[[], Tuple[object, Iterable[str]]]) -> Response:
+    """
+    Mengembalikan respons dari cache bila ada. Jika tidak, memanggil `build()` yang
+    mengembalikan (data, tags), memvalidasi data dengan `response_model`,
+    menyimpan hasil serialisasinya, lalu mengirimkannya.
+    """
+    key = request_key(request)
+    body = response_cache.get(key)
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    generation = response_cache.generation
+    body, tags = _render(response_model, build)
+    response_cache.set(key, body, tags, generation=generation)
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+
+async def cached_json_async(request: Request, response_model, db, build: Callable[[object], Tuple[object, Iterable[str]]]) -> Response:
+    """
+    Versi `cached_json` untuk AsyncSession: `build(session)` dijalankan lewat
+    `db.run_sync`, termasuk serialisasinya, sehingga lazy-load tetap berjalan.
+    """
+    key = request_key(request)
+    body = response_cache.get(key)
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    generation = response_cache.generation
+    body, tags = await db.run_sync(lambda session: _render(response_model, lambda: build(session)))
+    response_cache.set(key, body, tags, generation=generation)
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+
+def _render(response_model, build):
+    data, tags = build()
+    adapter = _adapter_for(response_model)
+    return adapter.dump_json(validate(response_model, data)), tags
@@ -0,0 +1,246 @@
+import csv
+import json
+import os
+import tempfile
+from typing import Iterable, Iterator, Optional, Tuple
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import fulltext, lesson_order, models, schemas
+
+# Impor katalog massal (kursus beserta lesson-nya) untuk satu instruktur.
+# Masukan dibaca per baris, divalidasi, lalu disisipkan per batch: satu executemany
+# untuk kursus (RETURNING id), satu untuk semua lesson-nya, satu INSERT ... SELECT
+# untuk index FTS, dan satu commit per batch. Memori dibatasi ukuran batch.
+# Baris yang tidak valid dicatat sebagai error dan dilewati; jika satu batch gagal
+# di database, batch itu diulang per kursus agar hanya baris yang bermasalah yang gagal.
+#
+# Format:
+# - NDJSON: satu objek per baris, mis.
+#     {"title": "...", "description": "...", "category_id": 1,
+#      "lessons": [{"title": "...", "video_url": "...", "content": "..."}]}
+# - CSV (dengan header): satu baris per lesson; baris berurutan dengan `course_ref`
+#   yang sama (atau `title` jika kolom itu tidak ada) membentuk satu kursus.
+#     course_ref,title,description,category_id,lesson_title,lesson_video_url,lesson_content
+
+CATALOG_IMPORT_BATCH_SIZE = int(os.getenv("CATALOG_IMPORT_BATCH_SIZE", "500"))
+CATALOG_IMPORT_MAX_ERRORS = int(os.getenv("CATALOG_IMPORT_MAX_ERRORS", "1000"))
+CATALOG_IMPORT_MAX_LESSONS = int(os.getenv("CATALOG_IMPORT_MAX_LESSONS", "1000"))
+CATALOG_IMPORT_MAX_BYTES = int(os.getenv("CATALOG_IMPORT_MAX_BYTES", str(200 * 1024 * 1024)))
+
+FORMATS = ("ndjson", "csv")
+_CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-seq": "ndjson",
+    "text/csv": "csv",
+}
+
+# (nomor baris, data, pesan error)
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+def format_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    return _CONTENT_TYPES.get((content_type or "").split(";")[0].strip().lower())
+
+
+def format_from_filename(filename: str) -> Optional[str]:
+    extension = os.path.splitext(filename)[1].lower()
+    return {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}.get(extension)
+
+
+def _ndjson_records(lines: Iterable[str]) -> Iterator[Record]:
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as error:
+            yield number, None, f"Invalid JSON: {error}"
+            continue
+        if not isinstance(data, dict):
+            yield number, None, "Each line must be a JSON object."
+            continue
+        yield number, data, None
+
+
+def _csv_records(lines: Iterable[str]) -> Iterator[Record]:
+    reader = csv.DictReader(lines)
+    first_row, current_key, current = 0, None, None
+    try:
+        for row in reader:
+            key = (row.get("course_ref") or row.get("title") or "").strip()
+            if current is None or key != current_key:
+                if current is not None:
+                    yield first_row, current, None
+                first_row, current_key = reader.line_num, key
+                current = {
+                    "title": row.get("title"),
+                    "description": row.get("description"),
+                    "category_id": row.get("category_id"),
+                    "lessons": [],
+                }
+            lesson_title = (row.get("lesson_title") or "").strip()
+            if lesson_title:
+                current["lessons"].append({
+                    "title": lesson_title,
+                    "video_url": row.get("lesson_video_url") or None,
+                    "content": row.get("lesson_content") or None,
+                })
+    except csv.Error as error:
+        # Baris CSV yang rusak membuat sisa file tidak bisa dibaca dengan pasti
+        yield reader.line_num, None, f"Invalid CSV, import stopped here: {error}"
+        return
+    if current is not None:
+        yield first_row, current, None
+
+
+def read_records(lines: Iterable[str], file_format: str) -> Iterator[Record]:
+    return _csv_records(lines) if file_format == "csv" else _ndjson_records(lines)
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in error.errors()
+    )
+
+
+class CatalogImporter:
+    def __init__(self, db: Session, instructor_id: int, batch_size: int = CATALOG_IMPORT_BATCH_SIZE):
+        self.db = db
+        self.instructor_id = instructor_id
+        self.batch_size = batch_size
+        self.category_ids = set(db.scalars(select(models.Category.id)))
+        self.batch = []  # [(nomor baris, CourseImport)]
+        self.courses_imported = 0
+        self.lessons_imported = 0
+        self.courses_failed = 0
+        self.errors = []
+        self.errors_truncated = False
+
+    def _fail(self, row: int, title: Optional[str], detail: str):
+        self.courses_failed += 1
+        if len(self.errors) < CATALOG_IMPORT_MAX_ERRORS:
+            self.errors.append(schemas.CatalogImportError(row=row, title=title, detail=detail))
+        else:
+            self.errors_truncated = True
+
+    def add(self, row: int, data: Optional[dict], error: Optional[str] = None):
+        if error is not None:
+            self._fail(row, None, error)
+            return
+        try:
+            course = schemas.CourseImport.model_validate(data)
+        except ValidationError as validation_error:
+            title = data.get("title")
+            self._fail(row, title if isinstance(title, str) else None, _describe(validation_error))
+            return
+        if course.category_id not in self.category_ids:
+            self._fail(row, course.title, f"Category with id {course.category_id} not found.")
+            return
+        if len(course.lessons) > CATALOG_IMPORT_MAX_LESSONS:
+            self._fail(row, course.title, f"Too many lessons (maximum {CATALOG_IMPORT_MAX_LESSONS}).")
+            return
+
+        self.batch.append((row, course))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def _insert(self, batch) -> int:
+        course_ids = self.db.execute(
+            insert(models.Course).returning(models.Course.id, sort_by_parameter_order=True),
+            [
+                {"title": course.title, "description": course.description,
+                 "category_id": course.category_id, "instruktur_id": self.instructor_id}
+                for _, course in batch
+            ]
+        ).scalars().all()
+
+        lessons = [
+            {"course_id": course_id, "title": lesson.title, "video_url": lesson.video_url,
+             "content": lesson.content, "position": (index + 1) * lesson_order.LESSON_POSITION_GAP}
+            for course_id, (_, course) in zip(course_ids, batch)
+            for index, lesson in enumerate(course.lessons)
+        ]
+        if lessons:
+            self.db.execute(insert(models.Lesson), lessons)
+        fulltext.index_courses(self.db, course_ids)
+        return len(lessons)
+
+    def flush(self):
+        batch, self.batch = self.batch, []
+        if not batch:
+            return
+        try:
+            lesson_count = self._insert(batch)
+            self.db.commit()
+            self.courses_imported += len(batch)
+            self.lessons_imported += lesson_count
+            return
+        except SQLAlchemyError:
+            self.db.rollback()
+
+        # Batch gagal: ulangi per kursus untuk menemukan baris yang bermasalah
+        for row, course in batch:
+            try:
+                lesson_count = self._insert([(row, course)])
+                self.db.commit()
+            except SQLAlchemyError as error:
+                self.db.rollback()
+                self._fail(row, course.title, f"Database error: {error.__class__.__name__}")
+                continue
+            self.courses_imported += 1
+            self.lessons_imported += lesson_count
+
+    def result(self) -> schemas.CatalogImportResult:
+        return schemas.CatalogImportResult(
+            courses_imported=self.courses_imported,
+            lessons_imported=self.lessons_imported,
+            courses_failed=self.courses_failed,
+            errors=self.errors,
+            errors_truncated=self.errors_truncated,
+        )
+
+
+def import_catalog(db: Session, lines: Iterable[str], file_format: str, instructor_id: int,
+                   batch_size: int = CATALOG_IMPORT_BATCH_SIZE) -> schemas.CatalogImportResult:
+    """Mengimpor semua kursus dari `lines` (baris teks NDJSON/CSV) atas nama `instructor_id`."""
+    importer = CatalogImporter(db, instructor_id, batch_size)
+    for row, data, error in read_records(lines, file_format):
+        importer.add(row, data, error)
+    importer.flush()
+    return importer.result()
+
+
+def import_file(db: Session, path: str, file_format: str, instructor_id: int,
+                batch_size: int = CATALOG_IMPORT_BATCH_SIZE) -> schemas.CatalogImportResult:
+    # newline="" sesuai anjuran modul csv; utf-8-sig membuang BOM dari ekspor spreadsheet
+    with open(path, encoding="utf-8-sig", errors="replace", newline="") as lines:
+        return import_catalog(db, lines, file_format, instructor_id, batch_size)
+
+
+async def save_body(chunks) -> str:
+    """
+    Menyalin body request (async iterator of bytes) ke file sementara per chunk, tanpa
+    menampung seluruh isinya di memori. Mengembalikan path file; pemanggil yang menghapusnya.
+    """
+    fd, path = await run_in_threadpool(tempfile.mkstemp, suffix=".import")
+    try:
+        written = 0
+        with os.fdopen(fd, "wb") as buffer:
+            async for chunk in chunks:
+                written += len(chunk)
+                if written > CATALOG_IMPORT_MAX_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                        detail=f"Import file is too large. Maximum size is {CATALOG_IMPORT_MAX_BYTES} bytes."
+                    )
+                if chunk:
+                    await run_in_threadpool(buffer.write, chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
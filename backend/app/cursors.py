@@ -0,0 +1,25 @@
+import base64
+import json
+from fastapi import HTTPException, status
+
+# Cursor opaque untuk paginasi keyset (?paginate=cursor): JSON kecil berisi posisi
+# terakhir, di-encode base64 URL-safe tanpa padding. Dipakai oleh /courses,
+# /my-enrollments, dan /favorites.
+# - {"id": ...}: lanjut dari id tersebut (urutan id DESC)
+# - {"offset": ...}: hasil pencarian yang diurutkan berdasarkan relevansi
+
+_POSITION_KEYS = ("id", "offset")
+
+
+def encode(**position) -> str:
+    payload = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded))
+        return {key: int(position[key]) for key in position if key in _POSITION_KEYS}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
@@ -1,17 +1,106 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from app import metrics, querystats
 
-# 1. Tentukan alamat atau URL database 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./course_app.db"
+# 1. Tentukan alamat atau URL database (bisa diganti lewat environment variable)
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./course_app.db")
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
 
-# 2. Buat "engine" SQLAlchemy
+# Ukuran pool koneksi. SQLite hanya mengizinkan satu penulis sekaligus, jadi pool
+# penulis dibuat kecil; pool pembaca boleh lebih besar karena WAL tidak memblokir pembaca.
+DB_WRITE_POOL_SIZE = int(os.getenv("DB_WRITE_POOL_SIZE", "4"))
+DB_WRITE_MAX_OVERFLOW = int(os.getenv("DB_WRITE_MAX_OVERFLOW", "4"))
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "16"))
+DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", "16"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# PRAGMA SQLite yang dipasang setiap kali koneksi baru dibuka
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+# Mode async (aiosqlite + AsyncSession) untuk router katalog, aktif jika DB_ASYNC=true.
+# Mode sync tetap menjadi default sehingga keduanya bisa dibandingkan.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+ASYNC_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, read_only: bool):
+    cursor = dbapi_connection.cursor()
+    if not read_only:
+        # WAL: pembaca tidak menunggu penulis (dan sebaliknya)
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    # Nilai negatif berarti ukuran dalam KiB
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    if read_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def _install_pragmas(sync_engine, read_only: bool):
+    # Hitung query per request (X-Query-Count / Server-Timing), lihat app/querystats.py
+    querystats.install(sync_engine)
+    if not IS_SQLITE:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        _apply_sqlite_pragmas(dbapi_connection, read_only)
+
+
+def _engine_options(pool_size: int, max_overflow: int):
+    options = {"pool_size": pool_size, "max_overflow": max_overflow, "pool_timeout": DB_POOL_TIMEOUT}
+    if IS_SQLITE:
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+# 2. Buat "engine" SQLAlchemy: satu untuk menulis, satu untuk membaca
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, **_engine_options(DB_WRITE_POOL_SIZE, DB_WRITE_MAX_OVERFLOW)
+)
+_install_pragmas(engine, read_only=False)
+
+read_engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, **_engine_options(DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW)
 )
+_install_pragmas(read_engine, read_only=True)
+
+metrics.register_engine("write", engine)
+metrics.register_engine("read", read_engine)
 
 # 3. Buat "pabrik" untuk sesi database
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+async_engine = None
+async_read_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+if DB_ASYNC:
+    # Diimpor hanya jika dipakai, karena membutuhkan paket aiosqlite
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, **_engine_options(DB_WRITE_POOL_SIZE, DB_WRITE_MAX_OVERFLOW)
+    )
+    _install_pragmas(async_engine.sync_engine, read_only=False)
+    async_read_engine = create_async_engine(
+        ASYNC_DATABASE_URL, **_engine_options(DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW)
+    )
+    _install_pragmas(async_read_engine.sync_engine, read_only=True)
+    metrics.register_engine("async_write", async_engine.sync_engine)
+    metrics.register_engine("async_read", async_read_engine.sync_engine)
+
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False)
 
 # 4. Buat sebuah Base class
 Base = declarative_base()
@@ -22,4 +111,22 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency untuk endpoint GET: memakai koneksi baca (query_only),
+# sehingga tidak pernah antre di belakang penulis
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency untuk mode async
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
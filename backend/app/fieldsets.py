@@ -0,0 +1,127 @@
+from typing import Dict, FrozenSet, List, Optional, Union
+from fastapi import HTTPException, Query, status
+from pydantic import ConfigDict, create_model
+from sqlalchemy.orm import joinedload, selectinload
+from app import lesson_order, models, schemas
+
+# Sparse fieldset untuk endpoint kursus: `?fields=` memilih kolom yang dikirim,
+# `?include=` menambahkan relasi (lessons, category, instruktur_username).
+# Tanpa keduanya respons tetap CourseDisplay lengkap seperti sebelumnya.
+# Opsi loader ditentukan dari field yang diminta: relasi yang tidak diminta tidak
+# di-load sama sekali, `lessons` memakai selectinload (satu query untuk semua kursus
+# di halaman), owner/category memakai JOIN. Jumlah query per respons jadi konstan,
+# berapa pun jumlah kursus di halaman.
+
+COURSE_FIELDS = tuple(schemas.CourseDisplay.model_fields)
+# Field yang membutuhkan relasi -> nama relasi di models.Course
+COURSE_RELATIONS = {"instruktur_username": "owner", "category": "category", "lessons": "lessons"}
+# Selalu dikirim (kunci untuk frontend dan tag cache)
+_REQUIRED_FIELDS = frozenset({"id"})
+
+Fieldset = Optional[FrozenSet[str]]  # None = semua field
+
+_course_models: Dict[FrozenSet[str], type] = {}
+_wrapper_models: Dict[tuple, type] = {}
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def parse(fields: Optional[str], include: Optional[str]) -> Fieldset:
+    requested_fields, included = _split(fields), _split(include)
+    unknown = [name for name in requested_fields if name not in COURSE_FIELDS]
+    unknown += [name for name in included if name not in COURSE_RELATIONS]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Unknown course field(s): {', '.join(unknown)}.")
+
+    if not requested_fields:
+        # Hanya include (atau tidak ada apa-apa): semua field seperti biasa
+        return None
+    return frozenset(requested_fields) | frozenset(included) | _REQUIRED_FIELDS
+
+
+def course_fieldset(
+    fields: Optional[str] = Query(
+        None, description="Daftar field kursus dipisah koma, mis. `id,title,thumbnail_url`. Default: semua field."
+    ),
+    include: Optional[str] = Query(
+        None, description="Relasi tambahan dipisah koma: `lessons`, `category`, `instruktur_username`."
+    ),
+) -> Fieldset:
+    """Dependency FastAPI untuk parameter `fields` dan `include`."""
+    return parse(fields, include)
+
+
+def course_model(fieldset: Fieldset) -> type:
+    """Model respons kursus yang hanya berisi field di `fieldset`."""
+    if fieldset is None:
+        return schemas.CourseDisplay
+    model = _course_models.get(fieldset)
+    if model is None:
+        source = schemas.CourseDisplay.model_fields
+        model = _course_models[fieldset] = create_model(
+            "CourseFields_" + "_".join(sorted(fieldset)),
+            __config__=ConfigDict(from_attributes=True),
+            **{name: (source[name].annotation, source[name]) for name in COURSE_FIELDS if name in fieldset}
+        )
+    return model
+
+
+def _wrapper(base: type, field: str, annotation, fieldset: Fieldset) -> type:
+    if fieldset is None:
+        return base
+    key = (base, fieldset)
+    model = _wrapper_models.get(key)
+    if model is None:
+        model = _wrapper_models[key] = create_model(
+            f"{base.__name__}_{course_model(fieldset).__name__}",
+            __base__=base,
+            **{field: (annotation, ...)}
+        )
+    return model
+
+
+def list_model(fieldset: Fieldset):
+    """Pasangan dari CourseListDisplay (paginasi page/cursor) untuk `fieldset`."""
+    results = List[course_model(fieldset)]
+    return Union[
+        _wrapper(schemas.PaginatedCourseDisplay, "results", results, fieldset),
+        _wrapper(schemas.CursorCourseDisplay, "results", results, fieldset),
+    ]
+
+
+def enrolled_model(fieldset: Fieldset) -> type:
+    return _wrapper(schemas.EnrolledCourseDisplay, "course", course_model(fieldset), fieldset)
+
+
+def cursor_model(fieldset: Fieldset) -> type:
+    return _wrapper(schemas.CursorCourseDisplay, "results", List[course_model(fieldset)], fieldset)
+
+
+def enrolled_cursor_model(fieldset: Fieldset) -> type:
+    return _wrapper(schemas.CursorEnrolledCourseDisplay, "results", List[enrolled_model(fieldset)], fieldset)
+
+
+def loader_options(fieldset: Fieldset, via=None) -> list:
+    """
+    Opsi loader untuk query models.Course berdasarkan field yang diminta.
+    `via` adalah loader relasi menuju Course (mis. joinedload(Enrollment.course))
+    bila Course bukan entitas utama query.
+    """
+    options = []
+    for field, relation in COURSE_RELATIONS.items():
+        if fieldset is not None and field not in fieldset:
+            continue
+        attribute = getattr(models.Course, relation)
+        if relation == "lessons":
+            # Satu query IN (...) untuk semua kursus; JOIN akan menggandakan baris kursus.
+            # Nomor urut dihitung dengan satu window function di query yang sama
+            loader = via.selectinload(attribute) if via is not None else selectinload(attribute)
+            options.append(loader.options(lesson_order.with_order()))
+        else:
+            options.append(via.joinedload(attribute) if via is not None else joinedload(attribute))
+    if not options and via is not None:
+        options.append(via)
+    return options
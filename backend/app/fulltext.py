@@ -0,0 +1,156 @@
+import html
+import logging
+import re
+from typing import Optional
+from sqlalchemy import Float, Integer, String, bindparam, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+# Index full-text (SQLite FTS5) untuk pencarian kursus.
+# Satu baris per kursus: rowid = courses.id, berisi judul, deskripsi, dan gabungan
+# judul semua lesson-nya. Index ini diperbarui oleh router courses dan lessons di
+# dalam transaksi yang sama dengan perubahan datanya.
+# Jika SQLite tidak mendukung FTS5, `available` bernilai False dan pencarian
+# kembali memakai ILIKE pada judul seperti sebelumnya.
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "courses_fts"
+
+# Bobot BM25 per kolom: title, description, lesson_titles
+BM25_WEIGHTS = (10.0, 2.0, 1.0)
+
+available = False
+
+_REINDEX_SQL = text(f"""
+    INSERT INTO {FTS_TABLE} (rowid, title, description, lesson_titles)
+    SELECT c.id,
+           COALESCE(c.title, ''),
+           COALESCE(c.description, ''),
+           COALESCE((SELECT group_concat(l.title, ' ') FROM lessons l WHERE l.course_id = c.id), '')
+    FROM courses c
+    WHERE c.id = :course_id
+""")
+
+_INDEX_MANY_SQL = text(f"""
+    INSERT INTO {FTS_TABLE} (rowid, title, description, lesson_titles)
+    SELECT c.id,
+           COALESCE(c.title, ''),
+           COALESCE(c.description, ''),
+           COALESCE((SELECT group_concat(l.title, ' ') FROM lessons l WHERE l.course_id = c.id), '')
+    FROM courses c
+    WHERE c.id IN :course_ids
+""").bindparams(bindparam("course_ids", expanding=True))
+
+
+def setup(engine: Engine) -> bool:
+    """Membuat tabel FTS5 (jika belum ada) dan mengisinya bila masih kosong."""
+    global available
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                "USING fts5(title, description, lesson_titles, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            ))
+            is_empty = conn.execute(text(f"SELECT NOT EXISTS (SELECT 1 FROM {FTS_TABLE})")).scalar()
+            has_courses = conn.execute(text("SELECT EXISTS (SELECT 1 FROM courses)")).scalar()
+    except OperationalError:
+        logger.warning("SQLite FTS5 is not available; course search falls back to ILIKE.")
+        available = False
+        return available
+
+    available = True
+    if is_empty and has_courses:
+        with Session(engine) as db:
+            rebuild(db)
+    return available
+
+
+def rebuild(db: Session) -> int:
+    """Membangun ulang seluruh index dari tabel courses dan lessons."""
+    if not available:
+        return 0
+    db.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    result = db.execute(text(f"""
+        INSERT INTO {FTS_TABLE} (rowid, title, description, lesson_titles)
+        SELECT c.id,
+               COALESCE(c.title, ''),
+               COALESCE(c.description, ''),
+               COALESCE(group_concat(l.title, ' '), '')
+        FROM courses c
+        LEFT JOIN lessons l ON l.course_id = c.id
+        GROUP BY c.id
+    """))
+    db.commit()
+    return result.rowcount
+
+
+def reindex_course(db: Session, course_id: int):
+    # Flush dulu agar perubahan yang belum tersimpan (autoflush=False) ikut terbaca
+    if not available:
+        return
+    db.flush()
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :course_id"), {"course_id": course_id})
+    db.execute(_REINDEX_SQL, {"course_id": course_id})
+
+
+def index_courses(db: Session, course_ids):
+    """Mengindeks banyak kursus baru sekaligus (satu INSERT ... SELECT), mis. saat impor massal."""
+    if not available or not course_ids:
+        return
+    db.execute(_INDEX_MANY_SQL, {"course_ids": list(course_ids)})
+
+
+def remove_course(db: Session, course_id: int):
+    if not available:
+        return
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :course_id"), {"course_id": course_id})
+
+
+def build_match_query(term: str) -> Optional[str]:
+    """
+    Mengubah input pengguna menjadi query FTS5 yang aman: setiap kata dikutip
+    (sehingga operator FTS tidak bisa disisipkan) dan dicocokkan sebagai prefix.
+    Contoh: 'pyth dasar' -> '"pyth"* "dasar"*'
+    """
+    tokens = re.findall(r"\w+", term, flags=re.UNICODE)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+# Penanda awal/akhir kata yang cocok di snippet mentah (karakter kontrol STX/ETX,
+# tidak muncul di teks biasa). Teks kursus di-escape dulu, baru penanda diganti <mark>,
+# sehingga HTML di judul/deskripsi/lesson tidak pernah sampai ke klien sebagai markup.
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+
+def render_snippet(raw: Optional[str]) -> Optional[str]:
+    if raw is None:
+        return None
+    escaped = html.escape(raw, quote=True)
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def matches(term: str):
+    """
+    Subquery (course_id, rank, snippet) untuk kata kunci `term`, atau None jika
+    FTS5 tidak tersedia / kata kunci tidak berisi token yang bisa dicari.
+    Nilai rank BM25 lebih kecil berarti lebih relevan.
+    """
+    match_query = build_match_query(term) if available else None
+    if match_query is None:
+        return None
+
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    return text(f"""
+        SELECT rowid AS course_id,
+               bm25({FTS_TABLE}, {weights}) AS rank,
+               snippet({FTS_TABLE}, -1, char(2), char(3), '…', 12) AS snippet
+        FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH :match_query
+    """).bindparams(match_query=match_query).columns(
+        course_id=Integer, rank=Float, snippet=String
+    ).subquery("search_matches")
@@ -1,12 +1,137 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from passlib.context import CryptContext
 
-# Buat konteks untuk hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Konfigurasi bcrypt dan worker pool (bisa diatur lewat environment variable)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_POOL_KIND = os.getenv("HASH_POOL_KIND", "thread")  # "thread" atau "process"
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+# Jumlah tugas yang boleh menunggu di antrean. Handler login/register bersifat sync,
+# jadi HASH_POOL_SIZE + HASH_QUEUE_LIMIT sebaiknya jauh di bawah ukuran threadpool
+# FastAPI (default 40) agar endpoint katalog tetap punya thread saat login ramai.
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "16"))
+HASH_RETRY_AFTER_SECONDS = int(os.getenv("HASH_RETRY_AFTER_SECONDS", "1"))
+
+# Buat konteks untuk hashing.
+# Jika BCRYPT_ROUNDS diubah, hash lama otomatis diperbarui saat user login (lihat verify_and_update)
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+class HashingPoolSaturated(Exception):
+    """Antrean hashing penuh; request sebaiknya dijawab 503 dengan Retry-After."""
+
+    def __init__(self, retry_after: int = HASH_RETRY_AFTER_SECONDS):
+        super().__init__("Password hashing pool is saturated.")
+        self.retry_after = retry_after
+
+
+class HashingPool:
+    """Executor khusus bcrypt dengan batas antrean (admission control)."""
+
+    def __init__(self, size: int, queue_limit: int, kind: str = "thread"):
+        self.size = size
+        self.queue_limit = queue_limit
+        self.kind = kind
+        self._pending = 0
+        self.rejected = 0  # jumlah tugas yang ditolak karena antrean penuh (untuk /metrics)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        # Dibuat saat pertama dipakai, agar import modul ini tidak langsung membuat proses
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.size)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="bcrypt")
+        return self._executor
+
+    @property
+    def in_flight(self) -> int:
+        return self._pending
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self._pending - self.size, 0)
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.size + self.queue_limit:
+                self.rejected += 1
+                raise HashingPoolSaturated()
+            self._pending += 1
+            executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+pool = HashingPool(size=HASH_POOL_SIZE, queue_limit=HASH_QUEUE_LIMIT, kind=HASH_POOL_KIND)
+
+
+def configure_pool(size: int = HASH_POOL_SIZE, queue_limit: int = HASH_QUEUE_LIMIT, kind: str = HASH_POOL_KIND):
+    # Ganti pool (dipakai oleh benchmark); pool lama ditutup setelah tugasnya selesai
+    global pool
+    old_pool, pool = pool, HashingPool(size=size, queue_limit=queue_limit, kind=kind)
+    old_pool.shutdown()
+    return pool
+
+
+# --- Fungsi yang dijalankan di dalam worker (harus bisa di-pickle untuk process pool) ---
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str):
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False, None
+    # Hash lama (mis. cost factor berbeda) dibuat ulang dengan pengaturan saat ini
+    if pwd_context.needs_update(hashed_password):
+        return True, pwd_context.hash(plain_password)
+    return True, None
+
 
 # Fungsi untuk mengenkripsi password
 def hash_password(password: str):
-    return pwd_context.hash(password)
+    return pool.submit(_hash, password).result()
 
 # Fungsi untuk memverifikasi password
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pool.submit(_verify, plain_password, hashed_password).result()
+
+# Verifikasi sekaligus hash baru jika hash lama perlu diperbarui.
+# Mengembalikan (valid, new_hash); new_hash bernilai None jika tidak perlu diperbarui.
+def verify_and_update(plain_password, hashed_password):
+    return pool.submit(_verify_and_update, plain_password, hashed_password).result()
+
+
+# Versi async, dipakai handler login/register/ganti password (`async def`): request menunggu
+# di event loop, bukan di thread threadpool. Versi sync di atas untuk skrip dan benchmark.
+async def hash_password_async(password: str):
+    return await asyncio.wrap_future(pool.submit(_hash, password))
+
+async def verify_password_async(plain_password, hashed_password):
+    return await asyncio.wrap_future(pool.submit(_verify, plain_password, hashed_password))
+
+async def verify_and_update_async(plain_password, hashed_password):
+    return await asyncio.wrap_future(pool.submit(_verify_and_update, plain_password, hashed_password))
@@ -1,11 +1,18 @@
 import jwt 
+import os
 from datetime import datetime, timedelta, timezone
+from app import schemas
 
 
 SECRET_KEY = "a_very_secret_key_that_is_long_and_random"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Jika aktif, klaim "uid" dan "role" di dalam token dipercaya langsung sehingga
+# request terautentikasi tidak perlu SELECT ke tabel users.
+# Konsekuensinya: perubahan role baru berlaku setelah token lama kedaluwarsa.
+TRUST_TOKEN_CLAIMS = os.getenv("JWT_TRUST_CLAIMS", "false").lower() in ("1", "true", "yes")
+
 # --- FUNGSI UNTUK MEMBUAT TOKEN ---
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -26,6 +33,6 @@ def verify_token(token: str, credentials_exception):
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-        return email
-    except jwt.PyJWTError:
+        return schemas.TokenData(email=email, id=payload.get("uid"), role=payload.get("role"))
+    except (jwt.PyJWTError, ValueError):
         raise credentials_exception
\ No newline at end of file
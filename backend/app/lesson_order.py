@@ -0,0 +1,129 @@
+from typing import List, Optional, Sequence
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, with_expression
+from app import models
+
+# Urutan lesson di dalam kursus.
+# Setiap lesson menyimpan kunci renggang `position` (10, 20, 30, ... dengan jarak
+# LESSON_POSITION_GAP), bukan nomor urut. Menyisipkan atau memindahkan lesson cukup
+# memberi satu baris posisi di tengah-tengah dua tetangganya; hanya jika celahnya
+# sudah habis seluruh kursus dinomori ulang (rebalance) sekali.
+# Nomor urut publik `Lesson.order` dihitung dari posisi (lihat models.py).
+
+LESSON_POSITION_GAP = 1024
+
+# Nomor urut untuk query yang memuat seluruh lesson satu atau beberapa kursus:
+# satu row_number() per partisi kursus, bukan COUNT terkorelasi per baris.
+# Hanya benar jika WHERE query memuat semua lesson kursus yang bersangkutan.
+ORDER_IN_COURSE = func.row_number().over(
+    partition_by=models.Lesson.course_id, order_by=(models.Lesson.position, models.Lesson.id)
+)
+
+
+def with_order():
+    """Opsi loader yang mengisi Lesson.order dengan ORDER_IN_COURSE."""
+    return with_expression(models.Lesson.order, ORDER_IN_COURSE)
+
+
+def course_lessons(db: Session, course_id: int):
+    """Semua lesson sebuah kursus sesuai urutan, dengan nomor urutnya."""
+    return db.query(models.Lesson).options(with_order()).filter(
+        models.Lesson.course_id == course_id
+    ).order_by(models.Lesson.position, models.Lesson.id).all()
+
+
+def _ordered_positions(course_id: int, exclude_id: Optional[int] = None):
+    query = select(models.Lesson.position).where(models.Lesson.course_id == course_id)
+    if exclude_id is not None:
+        query = query.where(models.Lesson.id != exclude_id)
+    return query.order_by(models.Lesson.position, models.Lesson.id)
+
+
+def position_for(db: Session, course_id: int, order: int, exclude_id: Optional[int] = None) -> int:
+    """
+    Mengembalikan posisi untuk lesson yang ditempatkan di nomor urut `order` (mulai
+    dari 1). `exclude_id` diisi saat memindahkan lesson yang sudah ada.
+    Nomor urut di luar rentang ditempatkan di awal atau di akhir.
+    """
+    while True:
+        if order <= 1:
+            before = 0
+            after = db.execute(_ordered_positions(course_id, exclude_id).limit(1)).scalar()
+        else:
+            # Dua tetangga: lesson ke-(order-1) dan ke-order saat ini
+            neighbours = db.execute(
+                _ordered_positions(course_id, exclude_id).offset(order - 2).limit(2)
+            ).scalars().all()
+            if not neighbours:
+                # Di luar rentang: taruh setelah lesson terakhir
+                last = db.execute(
+                    _ordered_positions(course_id, exclude_id)
+                    .order_by(None).order_by(models.Lesson.position.desc()).limit(1)
+                ).scalar()
+                return (last or 0) + LESSON_POSITION_GAP
+            before = neighbours[0]
+            after = neighbours[1] if len(neighbours) > 1 else None
+
+        if after is None:
+            return before + LESSON_POSITION_GAP
+        if after - before > 1:
+            return (before + after) // 2
+        # Celah habis: nomori ulang sekali, lalu hitung lagi
+        rebalance(db, course_id)
+
+
+def rebalance(db: Session, course_id: int):
+    lesson_ids = db.execute(
+        select(models.Lesson.id)
+        .where(models.Lesson.course_id == course_id)
+        .order_by(models.Lesson.position, models.Lesson.id)
+    ).scalars().all()
+    apply_order(db, lesson_ids)
+
+
+def apply_order(db: Session, lesson_ids: Sequence[int]):
+    """Menulis posisi baru untuk `lesson_ids` sesuai urutan list, dalam satu executemany."""
+    if not lesson_ids:
+        return
+    db.execute(
+        update(models.Lesson),
+        [{"id": lesson_id, "position": (index + 1) * LESSON_POSITION_GAP}
+         for index, lesson_id in enumerate(lesson_ids)],
+    )
+
+
+def insert_many(db: Session, course_id: int, items: List[dict]) -> List[models.Lesson]:
+    """
+    Menyisipkan beberapa lesson sekaligus. Setiap item ditempatkan pada nomor urut
+    `order`-nya (berurutan seperti di list), lalu posisi seluruh kursus dihitung sekali
+    dan hanya baris yang posisinya berubah yang ditulis.
+    """
+    existing = db.execute(
+        select(models.Lesson.id, models.Lesson.position)
+        .where(models.Lesson.course_id == course_id)
+        .order_by(models.Lesson.position, models.Lesson.id)
+    ).all()
+
+    sequence = list(existing)
+    new_lessons = []
+    for item in items:
+        data = dict(item)
+        order = data.pop("order")
+        lesson = models.Lesson(**data, course_id=course_id)
+        index = min(max(order, 1), len(sequence) + 1) - 1
+        sequence.insert(index, lesson)
+        new_lessons.append(lesson)
+
+    changed = []
+    for index, entry in enumerate(sequence):
+        position = (index + 1) * LESSON_POSITION_GAP
+        if isinstance(entry, models.Lesson):
+            entry.position = position
+        elif entry.position != position:
+            changed.append({"id": entry.id, "position": position})
+
+    if changed:
+        db.execute(update(models.Lesson), changed)
+    db.add_all(new_lessons)
+    db.flush()
+    return new_lessons
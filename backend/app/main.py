@@ -1,9 +1,14 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+from fastapi import Depends, FastAPI, Request, status
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware # <-- 1. Impor Middleware CORS
-from .routers import courses, users, authentication, categories, lessons, favorites, enrollments
-from . import models
-from .database import engine, SessionLocal
+from .routers import courses, users, authentication, categories, lessons, favorites, enrollments, profiles, analytics
+from . import models, fulltext, cache, hashing, database, metrics, profiling, querystats, thumbnails, uploads
+from .compression import CompressionMiddleware
+from .responses import FastJSONResponse
+from .staticfiles import CachedStaticFiles
+from .database import engine, SessionLocal, DB_ASYNC
+from .migrations import run_migrations
 
 INITIAL_CATEGORIES = [
     "Pemrograman",
@@ -23,7 +28,9 @@ def populate_categories():
     finally:
         db.close()
 
-app = FastAPI()
+# Default(...) menjaga jalur cepat FastAPI untuk endpoint dengan response_model
+# (Pydantic langsung menulis bytes JSON); FastJSONResponse (orjson) dipakai sisanya
+app = FastAPI(default_response_class=Default(FastJSONResponse))
 
 
 origins = [
@@ -37,25 +44,81 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"], # Izinkan semua metode (GET, POST, dll)
     allow_headers=["*"], # Izinkan semua header
+    expose_headers=["X-Query-Count", "Server-Timing", "X-Profile-Id"],
 )
 # --------------------------------
 
+# Tolak upload yang terlalu besar sebelum body-nya selesai dibaca
+app.add_middleware(uploads.UploadSizeLimitMiddleware)
+
+# Jumlah dan durasi query SQL per request sebagai header X-Query-Count / Server-Timing
+app.add_middleware(querystats.QueryStatsMiddleware)
+
+# Profil sampling per request (on-demand dengan token admin atau PROFILE_SAMPLE_RATE).
+# Di luar QueryStatsMiddleware agar daftar query-nya ikut direkam
+app.add_middleware(profiling.ProfilingMiddleware)
+
+# Kompresi gzip/brotli untuk respons JSON/teks yang cukup besar (middleware terluar)
+app.add_middleware(CompressionMiddleware)
+
+# Histogram latensi per route dan jumlah request yang sedang diproses (GET /metrics).
+# Paling luar agar waktu kompresi ikut terukur
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Antrean bcrypt penuh: tolak lebih awal daripada menghabiskan threadpool
+@app.exception_handler(hashing.HashingPoolSaturated)
+def hashing_pool_saturated_handler(request: Request, exc: hashing.HashingPoolSaturated):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please try again shortly."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 @app.on_event("startup")
 def on_startup():
     models.Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    fulltext.setup(engine)
     populate_categories()
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+@app.on_event("shutdown")
+async def on_shutdown():
+    hashing.pool.shutdown()
+    thumbnails.shutdown()
+    if DB_ASYNC:
+        await database.async_engine.dispose()
+
+# Thumbnail bernama hash dikirim sebagai immutable; lihat app/staticfiles.py
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
 
 # Daftarkan semua router
 app.include_router(authentication.router)
 app.include_router(users.router)
-app.include_router(courses.router)
-app.include_router(categories.router)
+# Router katalog punya versi async (AsyncSession) yang dipilih lewat DB_ASYNC
+if DB_ASYNC:
+    from .routers.aio import courses as aio_courses, categories as aio_categories
+    app.include_router(aio_courses.router)
+    app.include_router(aio_categories.router)
+else:
+    app.include_router(courses.router)
+    app.include_router(categories.router)
 app.include_router(lessons.router)
 app.include_router(enrollments.router)
 app.include_router(favorites.router)
+app.include_router(profiles.router)
+app.include_router(analytics.router)
 
 @app.get("/")
 def read_root():
-    return {"message": "Selamat datang di Course API"}
\ No newline at end of file
+    return {"message": "Selamat datang di Course API"}
+
+# Metrik format Prometheus: latensi per route, pool database, dan pool bcrypt.
+# async def: dirender di event loop, thread yang sama dengan pencatatnya (lihat app/metrics.py)
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return metrics.metrics_response()
+
+# Statistik hit/miss cache respons katalog publik (hanya admin, token sama dengan /profiles)
+@app.get("/cache/stats", include_in_schema=False, dependencies=[Depends(profiles.require_profile_admin)])
+def get_cache_stats():
+    return cache.response_cache.stats()
\ No newline at end of file
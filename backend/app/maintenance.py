@@ -0,0 +1,107 @@
+"""
+Tugas-tugas perawatan database yang dijalankan dari command line.
+
+Contoh (jalankan dari folder backend):
+    python -m app.maintenance recount-enrollments
+    python -m app.maintenance rebuild-search-index
+    python -m app.maintenance precompress-static
+    python -m app.maintenance import-catalog katalog.ndjson --instructor budi@example.com
+    python -m app.maintenance backfill-daily-stats
+"""
+import argparse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app import models, fulltext, staticfiles, catalog_import, analytics
+from app.database import SessionLocal, engine
+from app.migrations import run_migrations
+
+
+def recount_enrollments(db: Session) -> int:
+    """
+    Menghitung ulang `Course.enrollment_count` dari tabel enrollments.
+    Mengembalikan jumlah kursus yang nilainya sempat tidak sesuai.
+    """
+    actual_count = (
+        select(func.count(models.Enrollment.id))
+        .where(models.Enrollment.course_id == models.Course.id)
+        .scalar_subquery()
+    )
+
+    drifted = db.query(models.Course).filter(
+        models.Course.enrollment_count != actual_count
+    ).count()
+
+    if drifted:
+        db.query(models.Course).update(
+            {models.Course.enrollment_count: actual_count},
+            synchronize_session=False
+        )
+        db.commit()
+    return drifted
+
+
+def import_catalog_file(db: Session, args):
+    file_format = args.format or catalog_import.format_from_filename(args.path)
+    if file_format is None:
+        raise SystemExit("Cannot tell the file format from its extension; pass --format.")
+    instructor = db.query(models.User).filter(
+        (models.User.username == args.instructor) | (models.User.email == args.instructor)
+    ).first()
+    if instructor is None or instructor.role != models.UserRole.instruktur:
+        raise SystemExit(f"No instructor named {args.instructor}.")
+
+    result = catalog_import.import_file(db, args.path, file_format, instructor.id, args.batch_size)
+
+    for error in result.errors:
+        print(f"row {error.row}: {error.title or '-'}: {error.detail}")
+    if result.errors_truncated:
+        print("(more errors not shown)")
+    print(f"Imported {result.courses_imported} course(s) and {result.lessons_imported} lesson(s); "
+          f"{result.courses_failed} course(s) failed.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("recount-enrollments", help="Hitung ulang enrollment_count setiap kursus")
+    commands.add_parser("rebuild-search-index", help="Bangun ulang index pencarian FTS5")
+    commands.add_parser("precompress-static", help="Buat file .gz/.br untuk aset teks di folder static")
+    commands.add_parser("backfill-daily-stats",
+                        help="Isi rollup analitik harian dari riwayat enrollments yang sudah ada")
+    import_parser = commands.add_parser("import-catalog", help="Impor kursus + lesson dari file NDJSON/CSV")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--instructor", required=True, help="username atau email instruktur pemilik")
+    import_parser.add_argument("--format", choices=catalog_import.FORMATS,
+                               help="default: dari ekstensi file (.ndjson/.jsonl/.csv)")
+    import_parser.add_argument("--batch-size", type=int, default=catalog_import.CATALOG_IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.command == "precompress-static":
+        # Tidak butuh database
+        print(f"Wrote {staticfiles.precompress('static')} precompressed file(s).")
+        return
+
+    models.Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    fulltext.setup(engine)
+
+    db = SessionLocal()
+    try:
+        if args.command == "recount-enrollments":
+            drifted = recount_enrollments(db)
+            print(f"{drifted} course(s) had a stale enrollment_count and were fixed.")
+        elif args.command == "rebuild-search-index":
+            if not fulltext.available:
+                print("SQLite FTS5 is not available; nothing to rebuild.")
+            else:
+                print(f"Indexed {fulltext.rebuild(db)} course(s).")
+        elif args.command == "import-catalog":
+            import_catalog_file(db, args)
+        elif args.command == "backfill-daily-stats":
+            print(f"Backfilled {analytics.backfill(db)} course-day row(s) from existing enrollments.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import bisect
+import os
+import threading
+import time
+from sqlalchemy import event
+from starlette.responses import Response
+
+# Metrik aplikasi dalam format teks Prometheus (GET /metrics), tanpa dependensi tambahan.
+# - Histogram latensi request per (method, route template, status). Route template
+#   diambil dari route yang cocok (mis. /courses/{id}), bukan path asli, agar jumlah
+#   deret waktunya tetap kecil; path yang tidak cocok dengan route mana pun
+#   dikelompokkan sebagai "<unmatched>".
+# - Jumlah request yang sedang diproses.
+# - Pool koneksi SQLAlchemy per engine: ukuran, checked out, overflow, dan jumlah checkout.
+# - Pool bcrypt: worker, tugas berjalan, kedalaman antrean, dan penolakan (503).
+# Pencatatan per request hanya berupa beberapa operasi aritmetika di event loop
+# (satu thread), jadi tidak perlu lock. Karena itu render() juga harus dipanggil dari
+# event loop (GET /metrics adalah `async def`, tanpa I/O): dari thread lain histogram
+# bisa terbaca setengah diperbarui. Nilai pool dibaca saat /metrics di-scrape.
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Batas atas bucket histogram dalam detik
+LATENCY_BUCKETS = tuple(
+    float(bound) for bound in os.getenv(
+        "METRICS_LATENCY_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10"
+    ).split(",")
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "total", "count")
+
+    def __init__(self):
+        # Hitungan per bucket (non-kumulatif); elemen terakhir = +Inf
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+_latency = {}  # (method, route, status) -> _Histogram
+_in_flight = 0
+_engines = {}  # nama -> sync engine
+_checkouts = {}  # nama -> jumlah checkout
+# Checkout terjadi di thread worker (endpoint sync), jadi penghitungnya memakai lock
+_checkouts_lock = threading.Lock()
+
+
+def register_engine(name: str, sync_engine):
+    """Mendaftarkan engine agar pool-nya ikut dilaporkan (dipanggil dari app/database.py)."""
+    _engines[name] = sync_engine
+    _checkouts[name] = 0
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with _checkouts_lock:
+            _checkouts[name] += 1
+
+
+def _route_template(scope) -> str:
+    path = getattr(scope.get("route"), "path", None)
+    if path:
+        return path
+    # Mount (mis. /static) tidak menyetel scope["route"], tetapi menyetel endpoint dan root_path
+    if "endpoint" in scope and scope.get("root_path"):
+        return scope["root_path"] + "/{path}"
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _in_flight
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _in_flight -= 1
+            key = (scope["method"], _route_template(scope), status_code)
+            histogram = _latency.get(key)
+            if histogram is None:
+                histogram = _latency[key] = _Histogram()
+            histogram.observe(time.perf_counter() - started)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def render() -> str:
+    from app import hashing
+
+    lines = [
+        "# HELP http_request_duration_seconds Request latency by route template and status.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route, status_code), histogram in sorted(_latency.items()):
+        cumulative = 0
+        for bound, count in zip((*map(repr, LATENCY_BUCKETS), "+Inf"), histogram.buckets):
+            cumulative += count
+            bucket_labels = _labels(method=method, route=route, status=status_code, le=bound)
+            lines.append(f"http_request_duration_seconds_bucket{bucket_labels} {cumulative}")
+        labels = _labels(method=method, route=route, status=status_code)
+        lines.append(f"http_request_duration_seconds_sum{labels} {histogram.total}")
+        lines.append(f"http_request_duration_seconds_count{labels} {histogram.count}")
+
+    lines += [
+        "# HELP http_requests_in_flight Requests currently being processed.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {_in_flight}",
+    ]
+
+    pool_gauges = (
+        ("db_pool_size", "Configured pool size.", "size"),
+        ("db_pool_checked_out", "Connections currently checked out.", "checkedout"),
+        ("db_pool_checked_in", "Idle connections in the pool.", "checkedin"),
+        ("db_pool_overflow", "Connections opened beyond pool_size (negative: unused capacity).", "overflow"),
+    )
+    for metric, description, method in pool_gauges:
+        lines += [f"# HELP {metric} {description}", f"# TYPE {metric} gauge"]
+        for name, sync_engine in _engines.items():
+            reader = getattr(sync_engine.pool, method, None)
+            if reader is not None:
+                lines.append(f"{metric}{_labels(engine=name)} {reader()}")
+    lines += ["# HELP db_pool_checkouts_total Connection checkouts.", "# TYPE db_pool_checkouts_total counter"]
+    lines += [f"db_pool_checkouts_total{_labels(engine=name)} {count}" for name, count in _checkouts.items()]
+
+    pool = hashing.pool
+    lines += [
+        "# HELP bcrypt_pool_workers Password hashing workers.",
+        "# TYPE bcrypt_pool_workers gauge",
+        f"bcrypt_pool_workers {pool.size}",
+        "# HELP bcrypt_pool_in_flight Hashing tasks running or queued.",
+        "# TYPE bcrypt_pool_in_flight gauge",
+        f"bcrypt_pool_in_flight {pool.in_flight}",
+        "# HELP bcrypt_pool_queue_depth Hashing tasks waiting for a worker.",
+        "# TYPE bcrypt_pool_queue_depth gauge",
+        f"bcrypt_pool_queue_depth {pool.queue_depth}",
+        "# HELP bcrypt_pool_queue_limit Maximum queued hashing tasks before requests get 503.",
+        "# TYPE bcrypt_pool_queue_limit gauge",
+        f"bcrypt_pool_queue_limit {pool.queue_limit}",
+        "# HELP bcrypt_pool_rejected_total Hashing tasks rejected because the queue was full.",
+        "# TYPE bcrypt_pool_rejected_total counter",
+        f"bcrypt_pool_rejected_total {pool.rejected}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def metrics_response() -> Response:
+    return Response(content=render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,130 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from app.lesson_order import LESSON_POSITION_GAP
+
+# Migrasi kecil untuk database yang sudah ada.
+# `create_all` hanya membuat tabel baru, tidak menambah kolom/index ke tabel lama,
+# jadi perubahan skema pada tabel yang sudah ada dicatat di sini.
+# Setiap langkah harus idempoten karena dijalankan pada setiap startup.
+
+
+def _column_names(engine: Engine, table: str):
+    return {column["name"] for column in inspect(engine).get_columns(table)}
+
+
+def add_course_enrollment_count(engine: Engine):
+    if "enrollment_count" in _column_names(engine, "courses"):
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "ALTER TABLE courses ADD COLUMN enrollment_count INTEGER NOT NULL DEFAULT 0"
+        ))
+        # Isi nilai awal dari tabel enrollments
+        conn.execute(text(
+            "UPDATE courses SET enrollment_count = "
+            "(SELECT COUNT(*) FROM enrollments WHERE enrollments.course_id = courses.id)"
+        ))
+
+
+def add_course_ranking_indexes(engine: Engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_courses_enrollment_count ON courses (enrollment_count)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_courses_category_enrollment_count "
+            "ON courses (category_id, enrollment_count)"
+        ))
+
+
+def _index_exists(conn, name: str) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"), {"name": name}
+    ).first() is not None
+
+
+def add_user_course_unique_indexes(engine: Engine):
+    with engine.begin() as conn:
+        for table, index_name in (("enrollments", "ux_enrollments_user_course"),
+                                  ("favorites", "ux_favorites_user_course")):
+            if _index_exists(conn, index_name):
+                continue
+            # Buang duplikat lama (sisa race condition) sebelum index unik bisa dibuat
+            conn.execute(text(
+                f"DELETE FROM {table} WHERE id NOT IN "
+                f"(SELECT MIN(id) FROM {table} GROUP BY user_id, course_id)"
+            ))
+            conn.execute(text(f"CREATE UNIQUE INDEX {index_name} ON {table} (user_id, course_id)"))
+
+            if table == "enrollments":
+                # Duplikat yang dibuang juga sempat terhitung di enrollment_count
+                conn.execute(text(
+                    "UPDATE courses SET enrollment_count = "
+                    "(SELECT COUNT(*) FROM enrollments WHERE enrollments.course_id = courses.id)"
+                ))
+
+
+def add_lesson_positions(engine: Engine):
+    columns = _column_names(engine, "lessons")
+    with engine.begin() as conn:
+        if "position" not in columns:
+            conn.execute(text("ALTER TABLE lessons ADD COLUMN position INTEGER NOT NULL DEFAULT 0"))
+            # Nomor urut lama menjadi kunci renggang: 1 -> GAP, 2 -> 2*GAP, ...
+            conn.execute(text("""
+                UPDATE lessons SET position = (
+                    SELECT ranked.rn * :gap FROM (
+                        SELECT id, ROW_NUMBER() OVER (PARTITION BY course_id ORDER BY "order", id) AS rn
+                        FROM lessons
+                    ) AS ranked
+                    WHERE ranked.id = lessons.id
+                )
+            """), {"gap": LESSON_POSITION_GAP})
+        conn.execute(text("DROP INDEX IF EXISTS ix_lessons_course_order"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_lessons_course_position ON lessons (course_id, position)"
+        ))
+
+    if "order" in columns:
+        # Kolom lama tidak dipakai lagi. DROP COLUMN butuh SQLite >= 3.35;
+        # pada versi lebih lama kolomnya dibiarkan (nullable, tidak dibaca).
+        try:
+            with engine.begin() as conn:
+                conn.execute(text('ALTER TABLE lessons DROP COLUMN "order"'))
+        except OperationalError:
+            pass
+
+
+def add_course_thumbnail_columns(engine: Engine):
+    columns = _column_names(engine, "courses")
+    with engine.begin() as conn:
+        if "thumbnail_name" not in columns:
+            conn.execute(text("ALTER TABLE courses ADD COLUMN thumbnail_name VARCHAR"))
+        if "thumbnail_variants" not in columns:
+            conn.execute(text("ALTER TABLE courses ADD COLUMN thumbnail_variants JSON"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_courses_thumbnail_name ON courses (thumbnail_name)"
+        ))
+
+
+def add_user_library_indexes(engine: Engine):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_enrollments_user_id ON enrollments (user_id, id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_favorites_user_id ON favorites (user_id, id)"))
+
+
+# Urutan langkah penting: langkah baru selalu ditambahkan di akhir
+MIGRATIONS = [
+    add_course_enrollment_count,
+    add_course_ranking_indexes,
+    add_user_course_unique_indexes,
+    add_lesson_positions,
+    add_course_thumbnail_columns,
+    add_user_library_indexes,
+]
+
+
+def run_migrations(engine: Engine):
+    for migration in MIGRATIONS:
+        migration(engine)
@@ -1,7 +1,7 @@
 import enum
-from sqlalchemy import Column, Integer, String, TIMESTAMP, text, Enum
+from sqlalchemy import Column, Date, Integer, String, TIMESTAMP, JSON, text, Enum, Index, and_, func, or_, select
 from .database import Base 
-from sqlalchemy.orm import relationship 
+from sqlalchemy.orm import query_expression, relationship 
 from sqlalchemy import ForeignKey 
 
 
@@ -41,6 +41,15 @@ class Course(Base):
     title = Column(String, index=True)
     description = Column(String, nullable=True)
     thumbnail_url = Column(String, nullable=True)
+    # Nama file content-addressed (lihat Thumbnail) dan URL varian yang sudah diperkecil,
+    # mis. {"webp_320": "...", "jpeg_640": "..."}; NULL selama varian belum dibuat
+    thumbnail_name = Column(String, nullable=True, index=True)
+    thumbnail_variants = Column(JSON, nullable=True)
+
+    # Jumlah siswa yang terdaftar, disimpan langsung (denormalisasi) agar daftar kursus
+    # tidak perlu memuat semua baris Enrollment. Diperbarui oleh enroll/unenroll,
+    # dan bisa dihitung ulang dengan `python -m app.maintenance recount-enrollments`.
+    enrollment_count = Column(Integer, nullable=False, default=0, server_default=text('0'))
     
     # Foreign Keys
     instruktur_id = Column(Integer, ForeignKey("users.id"))
@@ -55,7 +64,7 @@ class Course(Base):
     category = relationship("Category", back_populates="courses")
     
     # Hubungan ke Lesson (dengan cascade delete)
-    lessons = relationship("Lesson", back_populates="course", cascade="all, delete-orphan")
+    lessons = relationship("Lesson", back_populates="course", cascade="all, delete-orphan", order_by="(Lesson.position, Lesson.id)")
     
     # Hubungan ke Enrollment (dengan cascade delete)
     enrollments = relationship("Enrollment", back_populates="course", cascade="all, delete-orphan")
@@ -63,12 +72,15 @@ class Course(Base):
     # Hubungan ke Favorite (dengan cascade delete)
     favorites = relationship("Favorite", back_populates="course", cascade="all, delete-orphan")
     
+    # Index untuk peringkat kursus terpopuler (ORDER BY enrollment_count DESC LIMIT k),
+    # baik global maupun per kategori
+    __table_args__ = (
+        Index("ix_courses_enrollment_count", "enrollment_count"),
+        Index("ix_courses_category_enrollment_count", "category_id", "enrollment_count"),
+    )
+
     # --- Properties (Kolom Virtual) ---
     
-    @property
-    def enrollment_count(self):
-        return len(self.enrollments)
-        
     @property
     def instruktur_username(self):
         # Tambahkan pengecekan untuk menghindari error jika owner belum ter-load
@@ -76,6 +88,16 @@ class Course(Base):
             return self.owner.username
         return None
 
+class Thumbnail(Base):
+    __tablename__ = "thumbnails"
+
+    # <sha256 isi file><ekstensi>, sama dengan nama file di static/images
+    name = Column(String, primary_key=True)
+    # Jumlah kursus yang memakai file ini; file dihapus saat mencapai 0
+    ref_count = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    variants = Column(JSON, nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+
 class Lesson(Base):
     __tablename__ = "lessons"
 
@@ -83,7 +105,9 @@ class Lesson(Base):
     title = Column(String, index=True)
     video_url = Column(String, nullable=True)
     content = Column(String, nullable=True) # Menggunakan String akan dipetakan ke TEXT
-    order = Column(Integer)
+    # Kunci urutan renggang (kelipatan LESSON_POSITION_GAP, lihat app/lesson_order.py).
+    # Nomor urut publik `order` (1, 2, 3, ...) dihitung dari kolom ini.
+    position = Column(Integer, nullable=False, server_default=text('0'))
 
     # Foreign Key yang mengikat Lesson ini ke sebuah Course
     course_id = Column(Integer, ForeignKey("courses.id"))
@@ -93,6 +117,32 @@ class Lesson(Base):
 
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
     updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'), onupdate=text('CURRENT_TIMESTAMP'))
+
+    # Daftar isi selalu dibaca per kursus dan diurutkan berdasarkan position
+    __table_args__ = (
+        Index("ix_lessons_course_position", "course_id", "position"),
+    )
+
+
+# Nomor urut publik (1, 2, 3, ...) dari posisi. Query daftar lesson mengisinya dengan
+# satu window function row_number() lewat lesson_order.with_order() (lihat app/lesson_order.py).
+# Nilai bawaan di bawah (jumlah lesson yang posisinya tidak di belakang lesson ini, lewat
+# index (course_id, position)) hanya untuk query satu lesson, mis. detail/edit lesson;
+# jangan dipakai untuk memuat banyak lesson karena dihitung ulang per baris.
+_lessons = Lesson.__table__
+_other_lesson = _lessons.alias("other_lesson")
+Lesson.order = query_expression(
+    select(func.count(_other_lesson.c.id))
+    .where(
+        _other_lesson.c.course_id == _lessons.c.course_id,
+        or_(
+            _other_lesson.c.position < _lessons.c.position,
+            and_(_other_lesson.c.position == _lessons.c.position, _other_lesson.c.id <= _lessons.c.id),
+        ),
+    )
+    .correlate_except(_other_lesson)
+    .scalar_subquery()
+)
     
 class Enrollment(Base):
     __tablename__ = "enrollments"
@@ -106,6 +156,13 @@ class Enrollment(Base):
     user = relationship("User", back_populates="enrollments")
     course = relationship("Course", back_populates="enrollments")
 
+    # Satu user hanya bisa terdaftar sekali di satu kursus
+    __table_args__ = (
+        Index("ux_enrollments_user_course", "user_id", "course_id", unique=True),
+        # Daftar kursus milik user, urut terbaru (paginasi cursor /my-enrollments, /favorites)
+        Index("ix_enrollments_user_id", "user_id", "id"),
+    )
+
 class Favorite(Base):
     __tablename__ = "favorites"
     id = Column(Integer, primary_key=True, index=True)
@@ -115,4 +172,23 @@ class Favorite(Base):
     
     user = relationship("User", back_populates="favorites")
     course = relationship("Course", back_populates="favorites")
-    
\ No newline at end of file
+
+    # Satu kursus hanya bisa difavoritkan sekali oleh user yang sama
+    __table_args__ = (
+        Index("ux_favorites_user_course", "user_id", "course_id", unique=True),
+        # Lihat ix_enrollments_user_id
+        Index("ix_favorites_user_id", "user_id", "id"),
+    )
+    
+
+# Rollup aktivitas harian per kursus (tanggal UTC) untuk analitik instruktur.
+# Diperbarui secara inkremental di jalur enroll/unenroll/favorit (lihat app/analytics.py),
+# sehingga deret waktu dibaca dari tabel kecil ini, bukan dari seluruh tabel enrollments.
+class CourseDailyStat(Base):
+    __tablename__ = "course_daily_stats"
+    course_id = Column(Integer, ForeignKey("courses.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    enrollments = Column(Integer, nullable=False, server_default=text("0"))
+    unenrollments = Column(Integer, nullable=False, server_default=text("0"))
+    favorites = Column(Integer, nullable=False, server_default=text("0"))
+    unfavorites = Column(Integer, nullable=False, server_default=text("0"))
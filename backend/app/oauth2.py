@@ -1,25 +1,69 @@
+import os
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app import jwt, models
-from app.database import get_db
+from app import jwt, models, schemas
+from app.cache import TTLCache
+from app.database import get_db, get_read_db
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+PRINCIPAL_CACHE_MAXSIZE = int(os.getenv("PRINCIPAL_CACHE_MAXSIZE", "10000"))
+
+# Cache identitas user per subject token (email), agar tidak SELECT users di setiap request
+_principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_MAXSIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+
+def _credentials_exception():
     # Siapkan error standar jika token tidak valid
-    credentials_exception = HTTPException(
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def get_current_principal(token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)) -> schemas.Principal:
+    """
+    Identitas ringan (id, email, role) untuk endpoint yang tidak butuh objek User lengkap.
+    Urutan sumber data: klaim token (jika JWT_TRUST_CLAIMS aktif) -> cache -> database.
+    """
+    credentials_exception = _credentials_exception()
+
     # Verifikasi token 
-    email = jwt.verify_token(token, credentials_exception)
+    token_data = jwt.verify_token(token, credentials_exception)
+
+    if jwt.TRUST_TOKEN_CLAIMS and token_data.id is not None and token_data.role is not None:
+        return schemas.Principal(id=token_data.id, email=token_data.email, role=token_data.role)
+
+    principal = _principal_cache.get(token_data.email)
+    if principal is None:
+        # Ambil hanya kolom yang dibutuhkan berdasarkan email di dalam token
+        row = db.query(models.User.id, models.User.email, models.User.role).filter(
+            models.User.email == token_data.email
+        ).first()
+        if row is None:
+            raise credentials_exception
+
+        principal = schemas.Principal(id=row.id, email=row.email, role=row.role)
+        _principal_cache.set(token_data.email, principal)
+
+    return principal
+
+
+def get_current_user(
+    principal: schemas.Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    # Objek User lengkap (ORM), untuk endpoint yang memang mengubah data user
+    user = db.get(models.User, principal.id)
+    if user is None:
+        raise _credentials_exception()
+    return user
 
-    # Ambil data lengkap user dari database berdasarkan email di dalam token
-    user = db.query(models.User).filter(models.User.email == email).first()
 
-    
-    return user
\ No newline at end of file
+def evict_principal(email: str):
+    # Dipanggil setelah data user (role, email, password) berubah
+    _principal_cache.pop(email)
@@ -0,0 +1,235 @@
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, QueryParams
+from app import querystats
+
+# Profiling per request, opsional.
+# - On-demand: kirim header `X-Profile-Token: <PROFILE_ADMIN_TOKEN>` (atau query
+#   `?profile=<token>`). Tanpa PROFILE_ADMIN_TOKEN fitur ini mati.
+# - Sampling: PROFILE_SAMPLE_RATE (mis. 0.001) memprofil sebagian kecil request biasa.
+# Selama request diproses, thread sampler membaca stack (sys._current_frames) thread
+# event loop dan worker threadpool AnyIO setiap PROFILE_SAMPLE_INTERVAL detik, lalu
+# menyimpannya dalam format "folded stacks" (flamegraph.pl, speedscope, inferno),
+# bersama daftar query SQL dan durasinya. Hasil disimpan sebagai JSON di PROFILE_DIR
+# (maks. PROFILE_STORE_MAX_FILES, yang terlama dihapus); nama file dikirim di header
+# X-Profile-Id dan bisa diambil lewat GET /profiles/{id} (lihat app/routers/profiles.py).
+# Sampler melihat seluruh thread tersebut, jadi pada proses yang sibuk sampel request
+# lain yang berjalan bersamaan bisa ikut tercatat.
+
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.002"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_STORE_MAX_FILES = int(os.getenv("PROFILE_STORE_MAX_FILES", "200"))
+# Batas profil yang berjalan bersamaan (masing-masing punya thread sampler)
+PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "2"))
+PROFILE_MAX_DEPTH = 128
+
+TOKEN_HEADER = "x-profile-token"
+TOKEN_QUERY_PARAM = "profile"
+_WORKER_THREAD_PREFIX = "AnyIO worker thread"
+# Thread yang sedang menunggu (event loop menunggu I/O, worker menunggu tugas) tidak dicatat
+_IDLE_FILES = ("selectors.py", "threading.py", "queue.py")
+_PROFILE_ID = re.compile(r"^[0-9A-Za-z_.-]+$")
+# Endpoint pemantauan tidak diprofil (membaca profil tidak boleh menggeser profil lama dari store)
+_SKIPPED_PREFIXES = ("/profiles", "/metrics")
+
+_slots = threading.BoundedSemaphore(PROFILE_MAX_CONCURRENT)
+_store_lock = threading.Lock()
+
+
+def is_admin(token: Optional[str]) -> bool:
+    return bool(PROFILE_ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, PROFILE_ADMIN_TOKEN)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _fold(frame) -> Optional[str]:
+    if frame.f_code.co_filename.endswith(_IDLE_FILES):
+        return None
+    labels = []
+    while frame is not None and len(labels) < PROFILE_MAX_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler(threading.Thread):
+    """Mengambil sampel stack thread event loop dan worker threadpool sampai request_stop() dipanggil."""
+
+    def __init__(self, loop_thread_id: int, interval: float = PROFILE_SAMPLE_INTERVAL):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+
+    def _watched_threads(self):
+        watched = {self.loop_thread_id}
+        watched.update(thread.ident for thread in threading.enumerate()
+                       if thread.name.startswith(_WORKER_THREAD_PREFIX))
+        return watched
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.samples += 1
+            watched = self._watched_threads()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in watched:
+                    stack = _fold(frame)
+                    if stack:
+                        self.stacks[stack] += 1
+
+    def request_stop(self):
+        # Hanya memberi sinyal; join() dilakukan dari worker thread agar event loop tidak menunggu
+        self._stopped.set()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _save(profile: dict) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_id = "{}-{}".format(
+        datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f"),
+        re.sub(r"[^0-9A-Za-z]+", "_", f"{profile['method']}_{profile['route']}").strip("_")[:80],
+    )
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.json")
+    temp_path = f"{path}.part"
+    with open(temp_path, "w") as handle:
+        json.dump(profile, handle)
+    os.replace(temp_path, path)
+
+    # Rotasi: hapus profil terlama bila melebihi batas
+    with _store_lock:
+        stored = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith(".json"))
+        for name in stored[:max(0, len(stored) - PROFILE_STORE_MAX_FILES)]:
+            try:
+                os.remove(os.path.join(PROFILE_DIR, name))
+            except FileNotFoundError:
+                pass
+    return profile_id
+
+
+def list_profiles() -> List[str]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return sorted((name[:-5] for name in os.listdir(PROFILE_DIR) if name.endswith(".json")), reverse=True)
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    try:
+        with open(os.path.join(PROFILE_DIR, f"{profile_id}.json")) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+def _requested(scope) -> Optional[str]:
+    # "on-demand" jika token admin valid, "sampled" jika terpilih acak, None jika tidak diprofil
+    token = Headers(scope=scope).get(TOKEN_HEADER)
+    if token is None and scope.get("query_string"):
+        token = QueryParams(scope["query_string"]).get(TOKEN_QUERY_PARAM)
+    if token is not None and is_admin(token):
+        return "on-demand"
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or (not PROFILE_ADMIN_TOKEN and PROFILE_SAMPLE_RATE <= 0)
+                or scope["path"].startswith(_SKIPPED_PREFIXES)):
+            return await self.app(scope, receive, send)
+        trigger = _requested(scope)
+        if trigger is None or not _slots.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        try:
+            await self._profile(scope, receive, send, trigger)
+        finally:
+            _slots.release()
+
+    async def _profile(self, scope, receive, send, trigger: str):
+        stats, token = querystats.begin(record=True)
+        sampler = StackSampler(threading.get_ident())
+        status_code = 500
+        response_start = None
+        started = time.perf_counter()
+        sampler.start()
+
+        async def capture_start(message):
+            nonlocal status_code, response_start
+            if message["type"] == "http.response.start":
+                # Header X-Profile-Id baru diketahui setelah profil disimpan
+                status_code, response_start = message["status"], message
+                return
+            if response_start is not None:
+                await send(await finish(response_start))
+                response_start = None
+            await send(message)
+
+        async def finish(start_message):
+            nonlocal saved_id
+            sampler.request_stop()
+            await run_in_threadpool(sampler.join)
+            saved_id = await run_in_threadpool(_save, self._build(scope, trigger, status_code, started,
+                                                                  sampler, stats))
+            headers = list(start_message.get("headers", []))
+            headers.append((b"x-profile-id", saved_id.encode()))
+            return {**start_message, "headers": headers}
+
+        saved_id = None
+        try:
+            await self.app(scope, receive, capture_start)
+        finally:
+            querystats.end(token)
+            if saved_id is None:
+                if response_start is not None:
+                    await send(await finish(response_start))
+                else:
+                    await finish({"headers": []})
+
+    @staticmethod
+    def _build(scope, trigger, status_code, started, sampler, stats) -> dict:
+        route = getattr(scope.get("route"), "path", None) or scope["path"]
+        return {
+            "trigger": trigger,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route,
+            "status": status_code,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "sample_interval_ms": sampler.interval * 1000,
+            "samples": sampler.samples,
+            "folded": sampler.folded(),
+            "sql": {
+                "count": stats.count,
+                "duration_ms": round(stats.duration * 1000, 3),
+                "statements": [
+                    {"statement": statement, "duration_ms": round(elapsed * 1000, 3)}
+                    for statement, elapsed in stats.statements
+                ],
+            },
+        }
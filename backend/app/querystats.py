@@ -0,0 +1,128 @@
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+
+# Penghitung query SQL per request.
+# Listener di engine (dipasang oleh app/database.py) menambah jumlah query dan total
+# waktunya ke objek QueryStats milik request yang sedang berjalan. Objek itu disimpan
+# di ContextVar: threadpool FastAPI dan greenlet AsyncSession mewarisi context-nya,
+# jadi query dari endpoint sync maupun async ikut terhitung.
+# QueryStatsMiddleware mengirimkan hasilnya sebagai header X-Query-Count dan
+# Server-Timing (terlihat di tab Network/Timing devtools browser).
+
+QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", "true").lower() in ("1", "true", "yes")
+
+
+class QueryStats:
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self, record: bool = False):
+        self.count = 0
+        self.duration = 0.0  # detik
+        # [(statement, detik)], hanya diisi bila record=True (query_budget, profiler)
+        self.statements = [] if record else None
+
+
+_current = contextvars.ContextVar("query_stats", default=None)
+# query_budget yang sedang aktif; menghitung query dari thread mana pun
+# (TestClient menjalankan aplikasi di thread lain)
+_budgets = []
+
+
+def current():
+    return _current.get()
+
+
+def begin(record: bool = False):
+    """Memulai penghitungan untuk context saat ini; kembalikan (stats, token) untuk end()."""
+    stats = QueryStats(record=record)
+    return stats, _current.set(stats)
+
+
+def end(token):
+    _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_stats_started"].pop()
+    stats = _current.get()
+    targets = _budgets if stats is None else [stats, *_budgets]
+    for target in targets:
+        target.count += 1
+        target.duration += elapsed
+        if target.statements is not None:
+            target.statements.append((statement, elapsed))
+
+
+def _handle_error(exception_context):
+    # Query gagal: buang waktu mulai agar tumpukan tetap seimbang
+    started = exception_context.connection.info.get("query_stats_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def install(sync_engine):
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class QueryStatsMiddleware:
+    """Menambahkan X-Query-Count dan Server-Timing (db) ke setiap respons HTTP."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not QUERY_STATS_HEADERS:
+            return await self.app(scope, receive, send)
+
+        # Profiler (app/profiling.py) bisa sudah memulai penghitungan yang merekam query
+        stats, token = _current.get(), None
+        if stats is None:
+            stats, token = begin()
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(stats.count).encode()))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"'.encode()
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            if token is not None:
+                end(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = ""):
+    """
+    Memastikan kode di dalam blok menjalankan paling banyak `max_queries` query.
+    Melempar AssertionError (berisi daftar query) jika melewati batas, mis.:
+
+        with query_budget(3, "GET /courses/"):
+            client.get("/courses/?limit=50")
+    """
+    stats = QueryStats(record=True)
+    _budgets.append(stats)
+    try:
+        yield stats
+    finally:
+        _budgets.remove(stats)
+    if stats.count > max_queries:
+        listing = "\n".join(f"  {index + 1}. {statement}" for index, (statement, _) in enumerate(stats.statements))
+        raise AssertionError(
+            f"{label or 'block'} ran {stats.count} queries, budget is {max_queries}:\n{listing}"
+        )
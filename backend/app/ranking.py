@@ -0,0 +1,95 @@
+import os
+import threading
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app import models
+from app.cache import TTLCache
+
+# Peringkat kursus terpopuler (featured) untuk homepage.
+# Top-K dihitung di database memakai index pada enrollment_count, lalu daftar
+# (course_id, enrollment_count) disimpan di cache kecil per (k, category_id).
+# Perubahan enrollment menyesuaikan entri cache bila bisa, atau membuangnya.
+# Setiap perubahan menaikkan _generation; hasil hitung ulang yang query-nya dimulai
+# sebelum perubahan tidak disimpan (sama seperti cache.ResponseCache).
+
+FEATURED_DEFAULT_K = 4
+FEATURED_MAX_K = 50
+FEATURED_CACHE_TTL = float(os.getenv("FEATURED_CACHE_TTL", "300"))
+
+_featured_cache = TTLCache(maxsize=128, ttl=FEATURED_CACHE_TTL)
+_lock = threading.Lock()
+_generation = 0
+
+
+def _sort_key(entry):
+    # Sama dengan ORDER BY enrollment_count DESC, id DESC
+    course_id, count = entry
+    return (count, course_id)
+
+
+def top_course_ids(db: Session, k: int = FEATURED_DEFAULT_K, category_id: Optional[int] = None) -> List[int]:
+    cache_key = (k, category_id)
+    entries = _featured_cache.get(cache_key)
+
+    if entries is None:
+        # Dibaca sebelum query: perubahan yang masuk selama query membatalkan penyimpanan
+        generation = _generation
+        query = db.query(models.Course.id, models.Course.enrollment_count)
+        if category_id:
+            query = query.filter(models.Course.category_id == category_id)
+        rows = query.order_by(
+            models.Course.enrollment_count.desc(),
+            models.Course.id.desc()
+        ).limit(k).all()
+
+        entries = [(row.id, row.enrollment_count) for row in rows]
+        with _lock:
+            if generation == _generation:
+                _featured_cache.set(cache_key, entries)
+
+    return [course_id for course_id, _ in entries]
+
+
+def on_enrollment_change(course_id: int, category_id: Optional[int], new_count: int, increased: bool):
+    """
+    Dipanggil setelah commit enroll/unenroll.
+    - Naik: jika kursus sudah ada di daftar, cukup urutkan ulang; jika ia menyalip
+      entri terakhir, masukkan dan buang entri terakhir.
+    - Turun: jika kursus ada di daftar, kursus lain di luar daftar mungkin menyalip,
+      jadi entri tersebut dibuang dan dihitung ulang pada request berikutnya.
+    """
+    global _generation
+    with _lock:
+        _generation += 1
+        for cache_key, entries in _featured_cache.items():
+            k, cached_category_id = cache_key
+            if cached_category_id is not None and cached_category_id != category_id:
+                continue
+
+            ids = [entry_id for entry_id, _ in entries]
+
+            if not increased:
+                if course_id in ids:
+                    _featured_cache.pop(cache_key)
+                continue
+
+            if course_id in ids:
+                adjusted = [(entry_id, new_count if entry_id == course_id else count) for entry_id, count in entries]
+            elif len(entries) < k:
+                # Daftar yang belum penuh seharusnya sudah memuat semua kursus; hitung ulang saja
+                _featured_cache.pop(cache_key)
+                continue
+            elif _sort_key((course_id, new_count)) > _sort_key(entries[-1]):
+                adjusted = entries[:-1] + [(course_id, new_count)]
+            else:
+                continue
+
+            _featured_cache.set(cache_key, sorted(adjusted, key=_sort_key, reverse=True))
+
+
+def invalidate():
+    # Dipakai saat kursus dibuat, dihapus, atau pindah kategori
+    global _generation
+    with _lock:
+        _generation += 1
+        _featured_cache.clear()
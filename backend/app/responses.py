@@ -0,0 +1,24 @@
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson opsional; tanpa orjson dipakai modul json bawaan
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Response JSON default aplikasi, diserialisasi dengan orjson bila terpasang.
+
+    Dipasang lewat `Default(...)` di main.py, sehingga endpoint yang punya
+    response_model tetap memakai jalur cepat FastAPI (Pydantic langsung menulis
+    bytes JSON, tanpa jsonable_encoder); kelas ini hanya dipakai untuk endpoint
+    yang mengembalikan dict biasa.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app import schemas, models, cache
+from app.database import get_async_read_db
+
+# Versi async dari router categories (dipakai jika DB_ASYNC=true)
+router = APIRouter(
+    prefix="/categories",
+    tags=["Categories"]
+)
+
+# Endpoint untuk mengambil semua kategori
+@router.get("/", response_model=List[schemas.Category])
+async def get_all_categories(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    def build(session):
+        categories = session.query(models.Category).all()
+        return categories, {"categories"}
+
+    return await cache.cached_json_async(request, List[schemas.Category], db, build)
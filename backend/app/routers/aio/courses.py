@@ -0,0 +1,158 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, status, UploadFile, File, Form, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from app import schemas, oauth2, ranking, cache, catalog_import, fieldsets, thumbnails, uploads
+from app.database import get_async_db, get_async_read_db
+from app.routers import courses
+
+# Versi async dari router courses (dipakai jika DB_ASYNC=true).
+# Logika query tetap satu sumber di app.routers.courses: fungsi-fungsinya menerima
+# Session sync dan dijalankan lewat AsyncSession.run_sync, sehingga I/O database
+# memakai aiosqlite tanpa memblokir event loop.
+router = APIRouter(
+    prefix="/courses",
+    tags=["Courses"]
+)
+
+# === ENDPOINT PUBLIK ===
+
+# 1. Melihat semua kursus
+@router.get("/", response_model=courses.CourseListDisplay)
+async def get_all_courses(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    limit: int = Query(4, ge=1, le=100),
+    cursor: Optional[str] = None,
+    paginate: Literal["page", "cursor"] = "page",
+    include_total: bool = False,
+    fieldset: fieldsets.Fieldset = Depends(fieldsets.course_fieldset)
+):
+    def build(session):
+        data = courses._list_courses(session, category_id, search, page, limit, cursor, paginate, include_total, fieldset)
+        tags = {"courses:list"} | {f"course:{course.id}" for course in data["results"]}
+        if search:
+            tags.add("courses:search")
+        return data, tags
+
+    return await cache.cached_json_async(request, fieldsets.list_model(fieldset), db, build)
+
+
+@router.get("/featured", response_model=List[schemas.CourseDisplay])
+async def get_featured_courses(
+    db: AsyncSession = Depends(get_async_read_db),
+    k: int = Query(ranking.FEATURED_DEFAULT_K, ge=1, le=ranking.FEATURED_MAX_K),
+    category_id: Optional[int] = None,
+    fieldset: fieldsets.Fieldset = Depends(fieldsets.course_fieldset)
+):
+    return await db.run_sync(
+        lambda session: cache.json_response(
+            List[fieldsets.course_model(fieldset)], courses._featured_courses(session, k, category_id, fieldset)
+        )
+    )
+
+
+# 4. Melihat semua kursus milik instruktur yang login
+@router.get("/my-courses", response_model=List[schemas.CourseDisplay])
+async def get_my_courses(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal),
+    fieldset: fieldsets.Fieldset = Depends(fieldsets.course_fieldset)
+):
+    return await db.run_sync(
+        lambda session: cache.json_response(
+            List[fieldsets.course_model(fieldset)], courses._instructor_courses(session, current_user, fieldset)
+        )
+    )
+
+
+# 2. Melihat detail satu kursus
+@router.get("/{id}", response_model=schemas.CourseDisplay)
+async def get_course_by_id(
+    id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    fieldset: fieldsets.Fieldset = Depends(fieldsets.course_fieldset)
+):
+    def build(session):
+        return courses._load_course(session, id, fieldset), {f"course:{id}"}
+
+    return await cache.cached_json_async(request, fieldsets.course_model(fieldset), db, build)
+
+# === ENDPOINT KHUSUS INSTRUKTUR ===
+
+# 3. Membuat kursus baru
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=schemas.CourseDisplay)
+async def create_course_with_upload(
+    background_tasks: BackgroundTasks,
+    title: str = Form(...),
+    description: Optional[str] = Form(None),
+    category_id: int = Form(...),
+    file: Optional[UploadFile] = File(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
+):
+    courses._require_instructor(current_user)
+
+    thumbnail = None
+    if file:
+        thumbnail = await uploads.save_thumbnail(file)
+        background_tasks.add_task(thumbnails.generate_variants, thumbnail.name)
+
+    return await db.run_sync(
+        courses._create_course, current_user, title, description, category_id, thumbnail
+    )
+
+
+# 3b. Impor katalog massal (NDJSON/CSV) milik instruktur yang login
+@router.post("/import", response_model=schemas.CatalogImportResult)
+async def import_courses(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
+):
+    courses._require_instructor(current_user)
+    file_format = courses._import_format(request, format)
+
+    path = await catalog_import.save_body(request.stream())
+    try:
+        return await db.run_sync(courses._import_catalog, current_user, path, file_format)
+    finally:
+        await uploads.remove_file(path)
+
+
+# 5. Mengedit kursus (update sebagian)
+@router.patch("/{id}", response_model=schemas.CourseDisplay)
+async def partial_update_course(
+    id: int,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal),
+    title: Optional[str] = Form(None),
+    description: Optional[str] = Form(None),
+    category_id: Optional[int] = Form(None),
+    file: Optional[UploadFile] = File(None)
+):
+    # Cek kepemilikan dulu sebelum menyimpan file apa pun
+    await db.run_sync(courses._get_editable_course, id, current_user)
+
+    thumbnail = None
+    if file:
+        thumbnail = await uploads.save_thumbnail(file)
+        background_tasks.add_task(thumbnails.generate_variants, thumbnail.name)
+    update_data = courses._collect_update_data(title, description, category_id)
+
+    return await db.run_sync(courses._update_course, id, current_user, update_data, thumbnail)
+
+# 6. Menghapus kursus
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_course(
+    id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
+):
+    await db.run_sync(courses._delete_course, id, current_user)
+    return
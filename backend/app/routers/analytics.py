@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from app import analytics, models, oauth2, schemas
+from app.database import get_read_db
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["Analytics"]
+)
+
+
+# Tren aktivitas kursus milik instruktur yang login, dari rollup harian (UTC).
+# Default: 30 hari terakhir per hari. Dua query: daftar kursus dan satu GROUP BY rollup.
+@router.get("/courses", response_model=schemas.CourseAnalytics)
+def get_course_analytics(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    interval: Literal["day", "week", "month"] = "day",
+    course_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
+):
+    if current_user.role != 'instruktur':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Access denied. Only instructors can view course analytics.")
+
+    end = end or analytics.today()
+    start = start or end - timedelta(days=min(29, (end - date.min).days))
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end.")
+    # Panjang rentang dicek secara aritmetika sebelum daftar periode dibuat
+    if analytics.period_count(start, end, interval) > analytics.MAX_PERIODS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Range too long for interval '{interval}' "
+                                   f"(maximum {analytics.MAX_PERIODS} periods).")
+    periods = analytics.periods(start, end, interval)
+
+    query = select(models.Course.id, models.Course.title).where(models.Course.instruktur_id == current_user.id)
+    if course_id is not None:
+        query = query.where(models.Course.id == course_id)
+    courses = db.execute(query.order_by(models.Course.id)).all()
+    if course_id is not None and not courses:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
+
+    activity = analytics.series(db, [course.id for course in courses], start, end, interval) if courses else {}
+
+    results = []
+    for course in courses:
+        by_period = activity[course.id]
+        totals = {metric: sum(point[metric] for point in by_period.values()) for metric in analytics.METRICS}
+        results.append({
+            "course_id": course.id,
+            "title": course.title,
+            "totals": totals,
+            "series": [{"period": period, **by_period.get(period, {})} for period in periods],
+        })
+    return {"start": start, "end": end, "interval": interval, "courses": results}
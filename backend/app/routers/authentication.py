@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app import models, hashing, jwt 
@@ -8,27 +9,45 @@ router = APIRouter(
     tags=["Authentication"]
 )
 
-@router.post("/login")
-def login(request: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    # Dapatkan input dari user
-    identifier = request.username 
-
-    
+def _find_user(db: Session, identifier: str):
     if "@" in identifier:
         
-        user = db.query(models.User).filter(models.User.email == identifier).first()
-    else:
-        # Jika tidak ada, kita anggap itu username
-        user = db.query(models.User).filter(models.User.username == identifier).first()
+        return db.query(models.User).filter(models.User.email == identifier).first()
+    # Jika tidak ada, kita anggap itu username
+    return db.query(models.User).filter(models.User.username == identifier).first()
 
 
-    if not user or not hashing.verify_password(request.password, user.hashed_password):
+def _save_password_hash(db: Session, user: models.User, new_hash: str):
+    user.hashed_password = new_hash
+    db.add(user)
+    db.commit()
+
+
+# async def: query database dijalankan di threadpool, sedangkan bcrypt ditunggu (await)
+# di pool hashing, sehingga tidak ada thread request yang tertahan selama hashing
+@router.post("/login")
+async def login(request: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    # Dapatkan input dari user (email atau username)
+    user = await run_in_threadpool(_find_user, db, request.username)
+
+    if user:
+        is_valid, new_hash = await hashing.verify_and_update_async(request.password, user.hashed_password)
+    else:
+        is_valid, new_hash = False, None
+
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username/email or password", 
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    data = {"sub": user.email, "role": user.role.value}
+    # Ambil data token sebelum commit (setelah commit atribut user kedaluwarsa)
+    data = {"sub": user.email, "role": user.role.value, "uid": user.id}
+
+    # Simpan hash baru jika cost factor bcrypt sudah berubah
+    if new_hash:
+        await run_in_threadpool(_save_password_hash, db, user, new_hash)
+
     access_token = jwt.create_access_token(data=data)
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from typing import List
-from app import schemas, models
-from app.database import get_db
+from app import schemas, models, cache
+from app.database import get_read_db
 
 router = APIRouter(
     prefix="/categories",
@@ -11,7 +11,10 @@ router = APIRouter(
 
 # Endpoint untuk mengambil semua kategori
 @router.get("/", response_model=List[schemas.Category])
-def get_all_categories(db: Session = Depends(get_db)):
-    categories = db.query(models.Category).all()
-    return categories
+def get_all_categories(request: Request, db: Session = Depends(get_read_db)):
+    def build():
+        categories = db.query(models.Category).all()
+        return categories, {"categories"}
+
+    return cache.cached_json(request, List[schemas.Category], build)
     
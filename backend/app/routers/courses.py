@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy import or_, and_
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-from app import schemas, models, oauth2
-from app.database import get_db
-import shutil
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Form, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional, Union
+from app import schemas, models, oauth2, ranking, fulltext, analytics, cache, catalog_import, cursors, fieldsets, thumbnails, uploads
+from app.cache import TTLCache
+from app.database import get_db, get_read_db
+import os
 import math
-import uuid
 
 # Setup router
 router = APIRouter(
@@ -16,35 +17,119 @@ router = APIRouter(
 
 # === ENDPOINT PUBLIK ===
 
+COURSE_COUNT_CACHE_TTL = float(os.getenv("COURSE_COUNT_CACHE_TTL", "30"))
+
+# Cache jumlah total kursus per kombinasi filter (category_id, search)
+_course_count_cache = TTLCache(maxsize=256, ttl=COURSE_COUNT_CACHE_TTL)
+
+
+def _filter_courses(query, category_id: Optional[int], search: Optional[str], matches=None):
+    # 1. Filter berdasarkan kategori jika ID-nya diberikan
+    if category_id:
+        query = query.filter(models.Course.category_id == category_id)
+
+    # 2. Filter berdasarkan kata kunci pencarian jika ada.
+    #    Pakai index FTS5 bila tersedia, jika tidak kembali ke ILIKE pada judul.
+    if search:
+        if matches is not None:
+            query = query.join(matches, matches.c.course_id == models.Course.id)
+        else:
+            search_term = f"%{search}%"
+            query = query.filter(models.Course.title.ilike(search_term))
+    return query
+
+
+def _count_courses(db: Session, category_id: Optional[int], search: Optional[str], matches=None) -> int:
+    cache_key = (category_id, search)
+    total_items = _course_count_cache.get(cache_key)
+    if total_items is None:
+        # Hitung langsung di tabel courses, tanpa JOIN/eager-load
+        count_query = _filter_courses(db.query(func.count(models.Course.id)), category_id, search, matches)
+        total_items = count_query.scalar()
+        _course_count_cache.set(cache_key, total_items)
+    return total_items
+
+
+CourseListDisplay = Union[schemas.PaginatedCourseDisplay, schemas.CursorCourseDisplay]
+
 # 1. Melihat semua kursus
-@router.get("/", response_model=schemas.PaginatedCourseDisplay)
+@router.get("/", response_model=CourseListDisplay)
 def get_all_courses(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     category_id: Optional[int] = None,
     search: Optional[str] = None,
-    page: int = 1,
-    limit: int = 4
+    page: int = Query(1, ge=1),
+    limit: int = Query(4, ge=1, le=100),
+    cursor: Optional[str] = None,
+    paginate: Literal["page", "cursor"] = "page",
+    include_total: bool = False,
+    fieldset: fieldsets.Fieldset = Depends(fieldsets.course_fieldset)
 ):
-    query = db.query(models.Course).options(
-        joinedload(models.Course.owner), 
-        joinedload(models.Course.category),
-        joinedload(models.Course.enrollments)
-    )
+    """
+    Dua mode paginasi:
+    - `page` (default): format lama PaginatedCourseDisplay dengan page/limit.
+    - `cursor`: keyset pada Course.id DESC. Kirim `next_cursor` dari respons sebelumnya
+      sebagai `cursor`; total hanya dihitung jika `include_total=true`.
+    Jika `search` diisi dan FTS5 tersedia, hasil diurutkan berdasarkan relevansi (BM25)
+    dan setiap kursus membawa `search_snippet`: teks yang sudah di-escape HTML, dengan kata
+    yang cocok ditandai <mark>.
+    `fields`/`include` membatasi field per kursus (lihat app/fieldsets.py), mis.
+    `?fields=id,title,thumbnail_url` untuk kartu kursus tanpa daftar lesson.
+    """
+    def build():
+        data = _list_courses(db, category_id, search, page, limit, cursor, paginate, include_total, fieldset)
+        tags = {"courses:list"} | {f"course:{course.id}" for course in data["results"]}
+        if search:
+            tags.add("courses:search")
+        return data, tags
 
-    # 1. Filter berdasarkan kategori jika ID-nya diberikan
-    if category_id:
-        query = query.filter(models.Course.category_id == category_id)
+    return cache.cached_json(request, fieldsets.list_model(fieldset), build)
 
-    # 2. Filter berdasarkan kata kunci pencarian jika ada
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(models.Course.title.ilike(search_term))
-    
-    # ---------------------------
 
-    total_items = query.count()
+def _list_courses(db: Session, category_id, search, page, limit, cursor, paginate, include_total,
+                  fieldset: fieldsets.Fieldset = None):
+    matches = fulltext.matches(search) if search else None
+
+    query = _filter_courses(
+        db.query(models.Course).options(*fieldsets.loader_options(fieldset)),
+        category_id, search, matches
+    )
+
+    if matches is not None:
+        query = query.add_columns(matches.c.snippet).order_by(matches.c.rank, models.Course.id.desc())
+    else:
+        query = query.order_by(models.Course.id.desc())
+
+    if paginate == "cursor" or cursor:
+        position = cursors.decode(cursor) if cursor else {}
+        offset = 0
+        if matches is not None:
+            # Urutan relevansi tidak monoton terhadap id, jadi cursor menyimpan offset
+            offset = position.get("offset", 0)
+        elif "id" in position:
+            query = query.filter(models.Course.id < position["id"])
+
+        # Ambil satu baris ekstra untuk tahu apakah masih ada halaman berikutnya
+        rows = query.limit(limit + 1).offset(offset).all()
+        courses = _with_snippets(rows[:limit], matches)
+
+        next_cursor = None
+        if len(rows) > limit:
+            if matches is not None:
+                next_cursor = cursors.encode(offset=offset + limit)
+            else:
+                next_cursor = cursors.encode(id=courses[-1].id)
+
+        return {
+            "results": courses,
+            "next_cursor": next_cursor,
+            "total_items": _count_courses(db, category_id, search, matches) if include_total else None
+        }
+
+    total_items = _count_courses(db, category_id, search, matches)
     offset = (page - 1) * limit
-    courses = query.order_by(models.Course.id.desc()).limit(limit).offset(offset).all()
+    courses = _with_snippets(query.limit(limit).offset(offset).all(), matches)
     total_pages = math.ceil(total_items / limit)
 
     return {
@@ -54,54 +139,44 @@ def get_all_courses(
         "results": courses
     }
 
-@router.get("/featured", response_model=List[schemas.CourseDisplay])
-def get_featured_courses(db: Session = Depends(get_db)):
-    """
-    Mengambil sejumlah kecil kursus untuk ditampilkan di homepage.
-    Logika: Mengambil semua kursus, mengurutkannya di Python, lalu mengambil 4 teratas.
-    """
-    # 1. Ambil SEMUA kursus dengan data relasi yang dibutuhkan
-    all_courses = db.query(models.Course).options(
-        joinedload(models.Course.owner), 
-        joinedload(models.Course.category),
-        joinedload(models.Course.enrollments)
-    ).all()
-    
-    # 2. Urutkan daftar kursus di dalam Python menggunakan 'sorted()'
-    sorted_courses = sorted(all_courses, key=lambda c: c.enrollment_count, reverse=True)
-    
-    # 3. Ambil 4 kursus pertama dari daftar yang sudah terurut
-    featured_courses = sorted_courses[:4]
-    
-    return featured_courses
 
+def _with_snippets(rows, matches):
+    # Baris hasil pencarian FTS berbentuk (Course, snippet); tempelkan snippet ke objeknya
+    if matches is None:
+        return rows
+    courses = []
+    for course, snippet in rows:
+        course.search_snippet = fulltext.render_snippet(snippet)
+        courses.append(course)
+    return courses
 
-# 4. Melihat semua kursus milik instruktur yang login
-@router.get("/my-courses", response_model=List[schemas.CourseDisplay])
-def get_my_courses(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
-):
+def _featured_courses(db: Session, k: int, category_id: Optional[int], fieldset: fieldsets.Fieldset = None):
+    featured_ids = ranking.top_course_ids(db, k=k, category_id=category_id)
+    if not featured_ids:
+        return []
+
+    courses = db.query(models.Course).options(
+        *fieldsets.loader_options(fieldset)
+    ).filter(models.Course.id.in_(featured_ids)).all()
+
+    # Kembalikan sesuai urutan peringkat
+    courses_by_id = {course.id: course for course in courses}
+    return [courses_by_id[course_id] for course_id in featured_ids if course_id in courses_by_id]
+
+
+def _instructor_courses(db: Session, current_user: schemas.Principal, fieldset: fieldsets.Fieldset = None):
     if current_user.role != 'instruktur':
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Access denied. Only instructors can view their courses.")
 
-    my_courses = db.query(models.Course).options(
-        joinedload(models.Course.owner),
-        joinedload(models.Course.category),
-        joinedload(models.Course.enrollments)
+    return db.query(models.Course).options(
+        *fieldsets.loader_options(fieldset)
     ).filter(models.Course.instruktur_id == current_user.id).all()
-        
-    return my_courses
 
 
-# 2. Melihat detail satu kursus
-@router.get("/{id}", response_model=schemas.CourseDisplay)
-def get_course_by_id(id: int, db: Session = Depends(get_db)):
+def _load_course(db: Session, id: int, fieldset: fieldsets.Fieldset = None):
     course = db.query(models.Course).options(
-        joinedload(models.Course.owner),
-        joinedload(models.Course.category),
-        joinedload(models.Course.enrollments)
+        *fieldsets.loader_options(fieldset)
     ).filter(models.Course.id == id).first()
 
     if not course:
@@ -109,81 +184,265 @@ def get_course_by_id(id: int, db: Session = Depends(get_db)):
                             detail=f"Course with id {id} not found.")
     return course
 
-# === ENDPOINT KHUSUS INSTRUKTUR ===
 
-# 3. Membuat kursus baru
-@router.post("/", status_code=status.HTTP_201_CREATED, response_model=schemas.CourseDisplay)
-async def create_course_with_upload(
-    title: str = Form(...),
-    description: Optional[str] = Form(None),
-    category_id: int = Form(...),
-    file: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
-):
-    # 1. Otorisasi: Hanya instruktur yang boleh membuat kursus
+def _get_editable_course(db: Session, id: int, current_user: schemas.Principal):
+    course = db.query(models.Course).filter(models.Course.id == id).first()
+
+    # Pengecekan standar
+    if not course:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Course with id {id} not found.")
+    
+    if course.instruktur_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Not authorized to perform requested action.")
+    return course
+
+
+def _require_instructor(current_user: schemas.Principal):
+    # Otorisasi: Hanya instruktur yang boleh membuat kursus
     if current_user.role != 'instruktur':
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Only instructors can create courses.")
-                            
-    
 
-    thumbnail_url = None # Default URL adalah None
-    
-    # Proses file HANYA jika file dikirim oleh pengguna
-    if file:
-        file_extension = file.filename.split('.')[-1]
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        file_path = f"static/images/{unique_filename}"
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        thumbnail_url = f"http://localhost:8000/{file_path}"
-
-    # 4. Buat objek kursus baru 
+
+def _attach_thumbnail(db: Session, course: models.Course, thumbnail: uploads.SavedThumbnail):
+    course.thumbnail_url = thumbnail.url
+    course.thumbnail_name = thumbnail.name
+    # File yang sama sudah pernah diunggah: variannya langsung bisa dipakai
+    course.thumbnail_variants = thumbnails.acquire(db, thumbnail.name)
+    # File baru dipindah ke tempatnya setelah pemakainya tercatat (di transaksi yang sama)
+    uploads.store_thumbnail(thumbnail)
+
+
+def _release_thumbnail(db: Session, thumbnail_name: Optional[str], thumbnail_url: Optional[str]) -> List[str]:
+    # Path file yang harus dihapus setelah commit (kosong jika masih dipakai kursus lain)
+    if thumbnail_name:
+        return thumbnails.release(db, thumbnail_name)
+    if thumbnail_url:
+        # Thumbnail lama (sebelum content-addressed) selalu milik satu kursus saja
+        return [uploads.url_to_path(thumbnail_url)]
+    return []
+
+
+def _remove_stale_files(db: Session, thumbnail_name: Optional[str], stale_files: List[str]):
+    # Dipanggil setelah commit; thumbnail content-addressed dicek ulang sebelum dihapus
+    if thumbnail_name and stale_files:
+        thumbnails.remove_released(db, thumbnail_name, stale_files)
+    else:
+        thumbnails.remove_files(stale_files)
+
+
+def _create_course(db: Session, current_user: schemas.Principal, title: str, description: Optional[str],
+                   category_id: int, thumbnail: Optional[uploads.SavedThumbnail]):
+    try:
+        return _insert_course(db, current_user, title, description, category_id, thumbnail)
+    finally:
+        if thumbnail:
+            uploads.discard_thumbnail(thumbnail)
+
+
+def _insert_course(db: Session, current_user: schemas.Principal, title: str, description: Optional[str],
+                   category_id: int, thumbnail: Optional[uploads.SavedThumbnail]):
+    # Buat objek kursus baru 
     new_course = models.Course(
         title=title,
         description=description,
         category_id=category_id,
-        thumbnail_url=thumbnail_url, 
         instruktur_id=current_user.id
     )
+    if thumbnail:
+        _attach_thumbnail(db, new_course, thumbnail)
 
-    # 5. Simpan kursus ke database
+    # Simpan kursus ke database
     db.add(new_course)
+    db.flush()
+    fulltext.reindex_course(db, new_course.id)
     db.commit()
     db.refresh(new_course)
+    ranking.invalidate()
+    _course_count_cache.clear()
+    cache.response_cache.invalidate("courses:list")
 
-    return new_course
+    return cache.validate(schemas.CourseDisplay, new_course)
 
 
+def _update_course(db: Session, id: int, current_user: schemas.Principal, update_data: dict,
+                   thumbnail: Optional[uploads.SavedThumbnail]):
+    try:
+        return _apply_course_update(db, id, current_user, update_data, thumbnail)
+    finally:
+        if thumbnail:
+            uploads.discard_thumbnail(thumbnail)
 
-# 5. Mengedit kursus (update sebagian)
-@router.patch("/{id}", response_model=schemas.CourseDisplay)
-async def partial_update_course(
+
+def _apply_course_update(db: Session, id: int, current_user: schemas.Principal, update_data: dict,
+                         thumbnail: Optional[uploads.SavedThumbnail]):
+    course = _get_editable_course(db, id, current_user)
+    course_query = db.query(models.Course).filter(models.Course.id == id)
+
+    # Jika ada data teks yang dikirim, lakukan update
+    if update_data:
+        course_query.update(update_data, synchronize_session=False)
+        fulltext.reindex_course(db, id)
+
+    # Ganti thumbnail jika ada file gambar baru yang sudah disimpan.
+    # Pemakai baru dicatat dulu, agar mengunggah ulang gambar yang sama tidak menghapusnya.
+    stale_files, old_name = [], None
+    if thumbnail:
+        old_name, old_url = course.thumbnail_name, course.thumbnail_url
+        _attach_thumbnail(db, course, thumbnail)
+        stale_files = _release_thumbnail(db, old_name, old_url)
+        db.add(course)
+
+    db.commit()
+
+    # File lama baru dihapus setelah commit berhasil
+    _remove_stale_files(db, old_name, stale_files)
+
+    if 'category_id' in update_data:
+        ranking.invalidate()
+    if update_data:
+        _course_count_cache.clear()
+        # Judul/deskripsi/kategori memengaruhi hasil filter dan pencarian di semua halaman
+        cache.response_cache.invalidate(f"course:{id}", "courses:list")
+    else:
+        cache.response_cache.invalidate(f"course:{id}")
+
+    # Ambil data terbaru yang lengkap 
+    return cache.validate(schemas.CourseDisplay, _load_course(db, id))
+
+
+def _delete_course(db: Session, id: int, current_user: schemas.Principal):
+    course = _get_editable_course(db, id, current_user)
+
+    thumbnail_name = course.thumbnail_name
+    stale_files = _release_thumbnail(db, thumbnail_name, course.thumbnail_url)
+    db.delete(course)
+    fulltext.remove_course(db, id)
+    analytics.remove_course(db, id)
+    # -------------------------------
+    
+    db.commit()
+    _remove_stale_files(db, thumbnail_name, stale_files)
+    ranking.invalidate()
+    _course_count_cache.clear()
+    cache.response_cache.invalidate(f"course:{id}", "courses:list")
+
+
+@router.get("/featured", response_model=List[schemas.CourseDisplay])
+def get_featured_courses(
+    db: Session = Depends(get_read_db),
+    k: int = Query(ranking.FEATURED_DEFAULT_K, ge=1, le=ranking.FEATURED_MAX_K),
+    category_id: Optional[int] = None,
+    fieldset: fieldsets.Fieldset = Depends(fieldsets.course_fieldset)
+):
+    """
+    Mengambil k kursus dengan siswa terbanyak untuk ditampilkan di homepage.
+    Logika: Top-K dihitung di database (ORDER BY enrollment_count DESC LIMIT k) dan
+    hasilnya di-cache per (k, category_id), lalu data lengkapnya diambil berdasarkan ID.
+    """
+    return cache.json_response(
+        List[fieldsets.course_model(fieldset)], _featured_courses(db, k, category_id, fieldset)
+    )
+
+
+# 4. Melihat semua kursus milik instruktur yang login
+@router.get("/my-courses", response_model=List[schemas.CourseDisplay])
+def get_my_courses(
+    db: Session = Depends(get_read_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal),
+    fieldset: fieldsets.Fieldset = Depends(fieldsets.course_fieldset)
+):
+    return cache.json_response(
+        List[fieldsets.course_model(fieldset)], _instructor_courses(db, current_user, fieldset)
+    )
+
+
+# 2. Melihat detail satu kursus
+@router.get("/{id}", response_model=schemas.CourseDisplay)
+def get_course_by_id(
     id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user),
-    title: Optional[str] = Form(None),
+    request: Request,
+    db: Session = Depends(get_read_db),
+    fieldset: fieldsets.Fieldset = Depends(fieldsets.course_fieldset)
+):
+    def build():
+        return _load_course(db, id, fieldset), {f"course:{id}"}
+
+    return cache.cached_json(request, fieldsets.course_model(fieldset), build)
+
+# === ENDPOINT KHUSUS INSTRUKTUR ===
+
+# 3. Membuat kursus baru
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=schemas.CourseDisplay)
+async def create_course_with_upload(
+    background_tasks: BackgroundTasks,
+    title: str = Form(...),
     description: Optional[str] = Form(None),
-    category_id: Optional[int] = Form(None),
-    file: Optional[UploadFile] = File(None)
+    category_id: int = Form(...),
+    file: Optional[UploadFile] = File(None),
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
 ):
-    course_query = db.query(models.Course).filter(models.Course.id == id)
-    course = course_query.first()
+    _require_instructor(current_user)
 
-    # Pengecekan standar
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail=f"Course with id {id} not found.")
+    thumbnail = None # Default: tanpa thumbnail
     
-    if course.instruktur_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
-                            detail="Not authorized to perform requested action.")
+    # Proses file HANYA jika file dikirim oleh pengguna (disalin per chunk, tanpa memblokir event loop)
+    if file:
+        thumbnail = await uploads.save_thumbnail(file)
+        # Varian yang diperkecil dibuat setelah respons terkirim
+        background_tasks.add_task(thumbnails.generate_variants, thumbnail.name)
 
-    
-    # 1. Buat dictionary untuk menampung data teks yang akan diupdate
+    # Session sync tidak boleh dipakai langsung di event loop: jalankan di threadpool
+    return await run_in_threadpool(
+        _create_course, db, current_user, title, description, category_id, thumbnail
+    )
+
+
+def _import_catalog(db: Session, current_user: schemas.Principal, path: str, file_format: str):
+    result = catalog_import.import_file(db, path, file_format, current_user.id)
+    if result.courses_imported:
+        ranking.invalidate()
+        _course_count_cache.clear()
+        cache.response_cache.invalidate("courses:list")
+    return result
+
+
+def _import_format(request: Request, file_format: Optional[str]) -> str:
+    file_format = file_format or catalog_import.format_from_content_type(request.headers.get("content-type"))
+    if file_format is None:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail="Send the catalog as application/x-ndjson or text/csv, or set ?format=.")
+    return file_format
+
+
+# 3b. Impor katalog massal (NDJSON/CSV) milik instruktur yang login
+@router.post("/import", response_model=schemas.CatalogImportResult)
+async def import_courses(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
+):
+    """
+    Body request adalah isi file NDJSON/CSV (bukan multipart); formatnya diambil dari
+    Content-Type atau `?format=`. Lihat app/catalog_import.py untuk bentuk datanya.
+    Baris yang gagal dilaporkan di `errors` tanpa membatalkan baris lainnya.
+    """
+    _require_instructor(current_user)
+    file_format = _import_format(request, format)
+
+    path = await catalog_import.save_body(request.stream())
+    try:
+        return await run_in_threadpool(_import_catalog, db, current_user, path, file_format)
+    finally:
+        await uploads.remove_file(path)
+
+
+def _collect_update_data(title: Optional[str], description: Optional[str], category_id: Optional[int]) -> dict:
+    # Buat dictionary untuk menampung data teks yang akan diupdate
     update_data = {}
     if title is not None:
         update_data['title'] = title
@@ -191,61 +450,38 @@ async def partial_update_course(
         update_data['description'] = description
     if category_id is not None:
         update_data['category_id'] = category_id
-    
-    # Jika ada data teks yang dikirim, lakukan update
-    if update_data:
-        course_query.update(update_data, synchronize_session=False)
+    return update_data
 
-    # 2. Cek apakah ada file gambar baru yang diunggah
-    if file:
-        if course.thumbnail_url:
-            # Dapatkan path file lama dari URL
-            old_file_path = course.thumbnail_url.replace("http://localhost:8000/", "")
-            if os.path.exists(old_file_path):
-                os.remove(old_file_path)
-
-        # Simpan file baru
-        file_path = f"static/images/{file.filename}"
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        thumbnail_url = f"http://localhost:8000/{file_path}"
-        # Update field thumbnail_url di objek course
-        course.thumbnail_url = thumbnail_url
-        db.add(course)
 
-   
-    db.commit()
+# 5. Mengedit kursus (update sebagian)
+@router.patch("/{id}", response_model=schemas.CourseDisplay)
+async def partial_update_course(
+    id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal),
+    title: Optional[str] = Form(None),
+    description: Optional[str] = Form(None),
+    category_id: Optional[int] = Form(None),
+    file: Optional[UploadFile] = File(None)
+):
+    # Cek kepemilikan dulu sebelum menyimpan file apa pun
+    await run_in_threadpool(_get_editable_course, db, id, current_user)
 
-    # Ambil data terbaru yang lengkap 
-    updated_course = db.query(models.Course).options(
-        joinedload(models.Course.owner),
-        joinedload(models.Course.category),
-        joinedload(models.Course.enrollments)
-    ).filter(models.Course.id == id).first()
+    thumbnail = None
+    if file:
+        thumbnail = await uploads.save_thumbnail(file)
+        background_tasks.add_task(thumbnails.generate_variants, thumbnail.name)
+    update_data = _collect_update_data(title, description, category_id)
 
-    return updated_course
+    return await run_in_threadpool(_update_course, db, id, current_user, update_data, thumbnail)
 
 # 6. Menghapus kursus
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_course(
     id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
 ):
-    course = db.query(models.Course).filter(models.Course.id == id).first()
-
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail=f"Course with id {id} not found.")
-    
-    if course.instruktur_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
-                            detail="Not authorized to perform requested action.")
-
-    db.delete(course)
-    # -------------------------------
-    
-    db.commit()
+    _delete_course(db, id, current_user)
     return
-
@@ -1,9 +1,11 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, delete, func, literal, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session, joinedload
-from typing import List
-from app import models, oauth2, schemas
-from app.database import get_db
+from typing import List, Literal, Optional, Union
+from app import analytics, cache, cursors, fieldsets, models, oauth2, ranking, schemas
+from app.database import get_db, get_read_db
 
 
 router = APIRouter(
@@ -15,68 +17,220 @@ router = APIRouter(
 def enroll_in_course(
     course_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
 ):
-    course = db.query(models.Course).filter(models.Course.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
+    # Satu statement: INSERT hanya jika kursus ada dan bukan milik user sendiri;
+    # index unik (user_id, course_id) membuat pendaftaran ganda diabaikan (ON CONFLICT DO NOTHING)
+    result = db.execute(
+        sqlite_insert(models.Enrollment)
+        .from_select(
+            ["user_id", "course_id"],
+            select(literal(current_user.id), models.Course.id).where(
+                models.Course.id == course_id,
+                models.Course.instruktur_id != current_user.id
+            )
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+    )
 
-    if course.instruktur_id == current_user.id:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Instructor cannot enroll in their own course.")
-
-    existing_enrollment = db.query(models.Enrollment).filter(
-        models.Enrollment.course_id == course_id,
-        models.Enrollment.user_id == current_user.id
-    ).first()
-
-    if existing_enrollment:
+    if result.rowcount == 0:
+        db.rollback()
+        # Tidak ada baris baru: cari tahu alasannya (hanya di jalur gagal)
+        course = db.query(models.Course.instruktur_id).filter(models.Course.id == course_id).first()
+        if not course:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
+        if course.instruktur_id == current_user.id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Instructor cannot enroll in their own course.")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User is already enrolled in this course.")
 
-    new_enrollment = models.Enrollment(course_id=course_id, user_id=current_user.id)
-    db.add(new_enrollment)
+    # Naikkan penghitung secara atomik di database (bukan di Python) dalam transaksi yang sama
+    updated = db.execute(
+        update(models.Course)
+        .where(models.Course.id == course_id)
+        .values(enrollment_count=models.Course.enrollment_count + 1)
+        .returning(models.Course.enrollment_count, models.Course.category_id)
+    ).one()
+    analytics.record(db, [course_id], "enrollments")
     db.commit()
+    ranking.on_enrollment_change(course_id, updated.category_id, updated.enrollment_count, increased=True)
+    cache.response_cache.invalidate(f"course:{course_id}")
 
     return {"message": "Successfully enrolled in the course."}
 
 
+# Mendaftar ke banyak kursus sekaligus (mis. satu paket kursus): satu query validasi,
+# satu INSERT multi-baris, satu UPDATE penghitung, dan satu commit untuk semuanya.
+# Hasilnya per id: created, already_present, not_found, atau own_course.
+@router.post("/enrollments/batch", response_model=schemas.CourseBatchResult)
+def enroll_in_courses(
+    request: schemas.CourseBatch,
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
+):
+    course_ids = list(dict.fromkeys(request.course_ids))
+    rows = db.execute(
+        select(models.Course.id, models.Course.instruktur_id, models.Enrollment.id.is_not(None).label("enrolled"))
+        .outerjoin(models.Enrollment, and_(
+            models.Enrollment.course_id == models.Course.id,
+            models.Enrollment.user_id == current_user.id
+        ))
+        .where(models.Course.id.in_(course_ids))
+    ).all()
+    found = {row.id: row for row in rows}
+
+    statuses = {}
+    for course_id in course_ids:
+        row = found.get(course_id)
+        if row is None:
+            statuses[course_id] = schemas.CourseBatchStatus.not_found
+        elif row.instruktur_id == current_user.id:
+            statuses[course_id] = schemas.CourseBatchStatus.own_course
+        elif row.enrolled:
+            statuses[course_id] = schemas.CourseBatchStatus.already_present
+
+    candidates = [course_id for course_id in course_ids if course_id not in statuses]
+    created = set()
+    if candidates:
+        # RETURNING hanya memuat baris yang benar-benar masuk; yang didahului request lain
+        # (ON CONFLICT DO NOTHING) tetap dilaporkan sebagai already_present
+        created = set(db.execute(
+            sqlite_insert(models.Enrollment)
+            .values([{"user_id": current_user.id, "course_id": course_id} for course_id in candidates])
+            .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+            .returning(models.Enrollment.course_id)
+        ).scalars())
+
+    updated = []
+    if created:
+        updated = db.execute(
+            update(models.Course)
+            .where(models.Course.id.in_(created))
+            .values(enrollment_count=models.Course.enrollment_count + 1)
+            .returning(models.Course.id, models.Course.enrollment_count, models.Course.category_id)
+        ).all()
+        analytics.record(db, created, "enrollments")
+        db.commit()
+    for course in updated:
+        ranking.on_enrollment_change(course.id, course.category_id, course.enrollment_count, increased=True)
+        cache.response_cache.invalidate(f"course:{course.id}")
+
+    for course_id in candidates:
+        statuses[course_id] = (schemas.CourseBatchStatus.created if course_id in created
+                               else schemas.CourseBatchStatus.already_present)
+    return schemas.CourseBatchResult(
+        created=len(created),
+        results=[schemas.CourseBatchItem(course_id=course_id, status=statuses[course_id]) for course_id in course_ids]
+    )
+
+
 # --- ENDPOINT  UNTUK MELIHAT KURSUS YANG DIIKUTI ---
-@router.get("/my-enrollments", response_model=List[schemas.EnrolledCourseDisplay])
+@router.get("/my-enrollments",
+            response_model=Union[List[schemas.EnrolledCourseDisplay], schemas.CursorEnrolledCourseDisplay])
 def get_my_enrolled_courses(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal),
+    fieldset: fieldsets.Fieldset = Depends(fieldsets.course_fieldset),
+    paginate: Optional[Literal["cursor"]] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_total: bool = False
 ):
+    """
+    Tanpa `paginate`/`cursor` respons tetap berupa daftar lengkap seperti sebelumnya
+    (hanya untuk kompatibilitas klien lama; frontend memakai `paginate=cursor`).
+    `paginate=cursor`: paling baru didaftari lebih dulu, `limit` per halaman; kirim
+    `next_cursor` sebagai `cursor` untuk halaman berikutnya. Memori dan ukuran respons
+    per request tidak bergantung pada jumlah kursus yang diikuti.
+    """
     # Query ke tabel enrollments, filter berdasarkan user yang login
-    enrollments = db.query(models.Enrollment).options(
-        joinedload(models.Enrollment.course)
-            .joinedload(models.Course.owner),
-        joinedload(models.Enrollment.course)
-            .joinedload(models.Course.category),
-        joinedload(models.Enrollment.course)
-            .joinedload(models.Course.enrollments) # untuk enrollment_count
-    ).filter(models.Enrollment.user_id == current_user.id).all()
-
-    return enrollments
+    query = db.query(models.Enrollment).options(
+        *fieldsets.loader_options(fieldset, via=joinedload(models.Enrollment.course))
+    ).filter(models.Enrollment.user_id == current_user.id)
+
+    if paginate is None and cursor is None:
+        return cache.json_response(List[fieldsets.enrolled_model(fieldset)], query.all())
+
+    # enrolled_at diisi database saat INSERT dan tidak pernah diubah, jadi urutan id
+    # sama dengan urutan enrolled_at; keyset pada id memakai index (user_id, id)
+    position = cursors.decode(cursor) if cursor else {}
+    if "id" in position:
+        query = query.filter(models.Enrollment.id < position["id"])
+    rows = query.order_by(models.Enrollment.id.desc()).limit(limit + 1).all()
+    enrollments = rows[:limit]
+
+    total_items = None
+    if include_total:
+        total_items = db.scalar(
+            select(func.count()).select_from(models.Enrollment)
+            .where(models.Enrollment.user_id == current_user.id)
+        )
+    return cache.json_response(fieldsets.enrolled_cursor_model(fieldset), {
+        "results": enrollments,
+        "next_cursor": cursors.encode(id=enrollments[-1].id) if len(rows) > limit else None,
+        "total_items": total_items
+    })
     
+# Penanda "terdaftar" dan "favorit" untuk kartu-kartu kursus di satu halaman, tanpa
+# mengunduh seluruh /my-enrollments dan /favorites. Dua query, masing-masing memakai
+# index unik (user_id, course_id). Contoh: /my-course-status?course_ids=1&course_ids=2
+@router.get("/my-course-status", response_model=List[schemas.CourseUserStatus])
+def get_my_course_status(
+    course_ids: List[int] = Query(..., min_length=1, max_length=100),
+    db: Session = Depends(get_read_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
+):
+    course_ids = list(dict.fromkeys(course_ids))
+    enrolled = set(db.scalars(
+        select(models.Enrollment.course_id).where(
+            models.Enrollment.user_id == current_user.id,
+            models.Enrollment.course_id.in_(course_ids)
+        )
+    ))
+    favorited = set(db.scalars(
+        select(models.Favorite.course_id).where(
+            models.Favorite.user_id == current_user.id,
+            models.Favorite.course_id.in_(course_ids)
+        )
+    ))
+    return [
+        schemas.CourseUserStatus(course_id=course_id, enrolled=course_id in enrolled,
+                                 favorited=course_id in favorited)
+        for course_id in course_ids
+    ]
+
 @router.delete("/enrollments/{course_id}", status_code=status.HTTP_204_NO_CONTENT)
 def unenroll_from_course(
     course_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
 ):
-    # Cari entri pendaftaran yang akan dihapus
-    enrollment_to_delete = db.query(models.Enrollment).filter(
-        models.Enrollment.course_id == course_id,
-        models.Enrollment.user_id == current_user.id
-    ).first()
-    
-    # Jika tidak ditemukan (pengguna memang tidak terdaftar), kembalikan error
-    if not enrollment_to_delete:
+    # Satu DELETE atomik: jika dua request batal bersamaan, hanya satu yang menghapus
+    # baris (rowcount 1), jadi penghitung dan rollup hanya turun/bertambah sekali
+    result = db.execute(
+        delete(models.Enrollment).where(
+            models.Enrollment.course_id == course_id,
+            models.Enrollment.user_id == current_user.id
+        )
+    )
+
+    # Jika tidak ada baris yang terhapus (pengguna memang tidak terdaftar), kembalikan error
+    if result.rowcount != 1:
+        db.rollback()
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, 
                             detail="Enrollment not found.")
-    
-    # Gunakan db.delete() untuk memicu logika SQLAlchemy
-    db.delete(enrollment_to_delete)
+
+    # Turunkan penghitung secara atomik, jangan sampai bernilai negatif
+    updated = db.execute(
+        update(models.Course)
+        .where(models.Course.id == course_id, models.Course.enrollment_count > 0)
+        .values(enrollment_count=models.Course.enrollment_count - 1)
+        .returning(models.Course.enrollment_count, models.Course.category_id)
+    ).first()
+    analytics.record(db, [course_id], "unenrollments")
     db.commit()
+    if updated:
+        ranking.on_enrollment_change(course_id, updated.category_id, updated.enrollment_count, increased=False)
+        cache.response_cache.invalidate(f"course:{course_id}")
     
     
     return
\ No newline at end of file
@@ -1,9 +1,11 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List
-from app import models, oauth2, schemas
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, func, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional, Union
+from app import analytics, cache, cursors, fieldsets, models, oauth2, schemas
+from app.database import get_db, get_read_db
 
 
 router = APIRouter(
@@ -16,62 +18,141 @@ router = APIRouter(
 def add_course_to_favorites(
     course_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
 ):
-    # Cek apakah kursus ada
-    course = db.query(models.Course).filter(models.Course.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
+    # Satu statement: INSERT hanya jika kursus ada; favorit ganda diabaikan
+    # berkat index unik (user_id, course_id)
+    result = db.execute(
+        sqlite_insert(models.Favorite)
+        .from_select(
+            ["user_id", "course_id"],
+            select(literal(current_user.id), models.Course.id).where(models.Course.id == course_id)
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+    )
 
-    # Cek apakah sudah pernah difavoritkan
-    existing_favorite = db.query(models.Favorite).filter(
-        models.Favorite.course_id == course_id,
-        models.Favorite.user_id == current_user.id
-    ).first()
-    if existing_favorite:
+    if result.rowcount == 0:
+        db.rollback()
+        # Cek apakah kursus ada
+        if not db.query(models.Course.id).filter(models.Course.id == course_id).first():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Course already in favorites.")
 
-    # Jika belum, tambahkan ke favorit
-    new_favorite = models.Favorite(course_id=course_id, user_id=current_user.id)
-    db.add(new_favorite)
+    analytics.record(db, [course_id], "favorites")
     db.commit()
 
     return {"message": "Course successfully added to favorites."}
 
 
+# Memfavoritkan banyak kursus sekaligus: satu query validasi, satu INSERT multi-baris,
+# satu commit. Hasilnya per id: created, already_present, atau not_found.
+@router.post("/favorites/batch", response_model=schemas.CourseBatchResult)
+def add_courses_to_favorites(
+    request: schemas.CourseBatch,
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
+):
+    course_ids = list(dict.fromkeys(request.course_ids))
+    rows = db.execute(
+        select(models.Course.id, models.Favorite.id.is_not(None).label("favorited"))
+        .outerjoin(models.Favorite, and_(
+            models.Favorite.course_id == models.Course.id,
+            models.Favorite.user_id == current_user.id
+        ))
+        .where(models.Course.id.in_(course_ids))
+    ).all()
+    found = {row.id: row for row in rows}
+
+    statuses = {}
+    for course_id in course_ids:
+        row = found.get(course_id)
+        if row is None:
+            statuses[course_id] = schemas.CourseBatchStatus.not_found
+        elif row.favorited:
+            statuses[course_id] = schemas.CourseBatchStatus.already_present
+
+    candidates = [course_id for course_id in course_ids if course_id not in statuses]
+    created = set()
+    if candidates:
+        # Favorit yang didahului request lain (ON CONFLICT DO NOTHING) tidak ikut di RETURNING
+        created = set(db.execute(
+            sqlite_insert(models.Favorite)
+            .values([{"user_id": current_user.id, "course_id": course_id} for course_id in candidates])
+            .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+            .returning(models.Favorite.course_id)
+        ).scalars())
+        analytics.record(db, created, "favorites")
+        db.commit()
+
+    for course_id in candidates:
+        statuses[course_id] = (schemas.CourseBatchStatus.created if course_id in created
+                               else schemas.CourseBatchStatus.already_present)
+    return schemas.CourseBatchResult(
+        created=len(created),
+        results=[schemas.CourseBatchItem(course_id=course_id, status=statuses[course_id]) for course_id in course_ids]
+    )
+
+
 @router.delete("/courses/{course_id}/favorite", status_code=status.HTTP_204_NO_CONTENT)
 def remove_course_from_favorites(
     course_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
 ):
-    # Cari entri favorit yang akan dihapus
-    favorite_to_delete = db.query(models.Favorite).filter(
+    # Satu DELETE atomik; rollup hanya dicatat jika baris benar-benar terhapus
+    # (dua request bersamaan tidak tercatat dua kali)
+    deleted = db.query(models.Favorite).filter(
         models.Favorite.course_id == course_id,
         models.Favorite.user_id == current_user.id
-    )
+    ).delete(synchronize_session=False)
 
-    if not favorite_to_delete.first():
+    if deleted != 1:
+        db.rollback()
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Favorite entry not found.")
 
-    # Hapus entri
-    favorite_to_delete.delete(synchronize_session=False)
+    analytics.record(db, [course_id], "unfavorites")
     db.commit()
     return
 
 
 # === ENDPOINT UNTUK MELIHAT DAFTAR FAVORIT ===
 
-@router.get("/favorites", response_model=List[schemas.CourseDisplay])
+@router.get("/favorites", response_model=Union[List[schemas.CourseDisplay], schemas.CursorCourseDisplay])
 def get_my_favorite_courses(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal),
+    fieldset: fieldsets.Fieldset = Depends(fieldsets.course_fieldset),
+    paginate: Optional[Literal["cursor"]] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_total: bool = False
 ):
-    favorite_courses = db.query(models.Course).join(models.Favorite).filter(
+    """
+    Tanpa `paginate`/`cursor` respons tetap berupa daftar lengkap seperti sebelumnya
+    (hanya untuk kompatibilitas klien lama; frontend memakai `paginate=cursor`).
+    `paginate=cursor`: favorit terbaru lebih dulu, sama seperti /my-enrollments.
+    """
+    query = db.query(models.Course).join(models.Favorite).filter(
         models.Favorite.user_id == current_user.id
-    ).options(
-        joinedload(models.Course.owner),
-        joinedload(models.Course.category)
-    ).all()
-
-    return favorite_courses
\ No newline at end of file
+    ).options(*fieldsets.loader_options(fieldset))
+
+    if paginate is None and cursor is None:
+        return cache.json_response(List[fieldsets.course_model(fieldset)], query.all())
+
+    # Keyset pada Favorite.id (urutan ditambahkan), memakai index (user_id, id)
+    position = cursors.decode(cursor) if cursor else {}
+    if "id" in position:
+        query = query.filter(models.Favorite.id < position["id"])
+    rows = query.add_columns(models.Favorite.id).order_by(models.Favorite.id.desc()).limit(limit + 1).all()
+    favorite_courses = [course for course, _ in rows[:limit]]
+
+    total_items = None
+    if include_total:
+        total_items = db.scalar(
+            select(func.count()).select_from(models.Favorite).where(models.Favorite.user_id == current_user.id)
+        )
+    return cache.json_response(fieldsets.cursor_model(fieldset), {
+        "results": favorite_courses,
+        "next_cursor": cursors.encode(id=rows[limit - 1][1]) if len(rows) > limit else None,
+        "total_items": total_items
+    })
@@ -1,64 +1,111 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_ 
 from typing import List
-from app import schemas, models, oauth2
-from app.database import get_db
+from app import schemas, models, oauth2, fulltext, cache, lesson_order
+from app.database import get_db, get_read_db
 
 router = APIRouter(
     tags=["Lessons"]
 )
 
+def _get_own_course(db: Session, course_id: int, current_user: schemas.Principal):
+    course = db.query(models.Course.instruktur_id).filter(models.Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
+
+    if course.instruktur_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to add lesson to this course.")
+    return course
+
 # Endpoint untuk membuat lesson baru di dalam sebuah course
 @router.post("/courses/{course_id}/lessons", status_code=status.HTTP_201_CREATED, response_model=schemas.LessonDisplay)
 def create_lesson_for_course(
     course_id: int,
     request: schemas.LessonCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
 ):
-    course = db.query(models.Course).filter(models.Course.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
-    
-    if course.instruktur_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to add lesson to this course.")
-        
-    
-    # Ambil semua pelajaran yang urutannya lebih besar atau sama dengan urutan baru
-    lessons_to_shift = db.query(models.Lesson).filter(
-        models.Lesson.course_id == course_id,
-        models.Lesson.order >= request.order
-    ).order_by(models.Lesson.order.desc()).all() # Urutkan dari yang terbesar 
-
-    # Geser semua pelajaran tersebut satu langkah ke belakang (tambah 1)
-    for lesson in lessons_to_shift:
-        lesson.order += 1
-        db.add(lesson)
-    # ----------------------------------------------------
-
-    # Setelah ruang dibuat, baru buat lesson baru
-    new_lesson = models.Lesson(**request.model_dump(), course_id=course_id)
+    _get_own_course(db, course_id, current_user)
+
+    # Cukup satu baris baru: posisi diambil dari celah di antara dua tetangganya
+    lesson_data = request.model_dump(exclude={"order"})
+    new_lesson = models.Lesson(
+        **lesson_data,
+        course_id=course_id,
+        position=lesson_order.position_for(db, course_id, request.order)
+    )
     db.add(new_lesson)
+    fulltext.reindex_course(db, course_id)
     db.commit()
     db.refresh(new_lesson)
+    cache.response_cache.invalidate(f"course:{course_id}", "courses:search")
     return new_lesson
 
+# Endpoint untuk membuat beberapa lesson sekaligus dalam satu transaksi
+@router.post("/courses/{course_id}/lessons/bulk", status_code=status.HTTP_201_CREATED, response_model=List[schemas.LessonDisplay])
+def bulk_create_lessons(
+    course_id: int,
+    request: List[schemas.LessonCreate],
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
+):
+    _get_own_course(db, course_id, current_user)
+
+    new_lessons = lesson_order.insert_many(db, course_id, [item.model_dump() for item in request])
+    new_ids = [lesson.id for lesson in new_lessons]
+    fulltext.reindex_course(db, course_id)
+    db.commit()
+    cache.response_cache.invalidate(f"course:{course_id}", "courses:search")
+
+    new_ids = set(new_ids)
+    return [lesson for lesson in lesson_order.course_lessons(db, course_id) if lesson.id in new_ids]
+
+# Endpoint untuk menyusun ulang seluruh daftar isi sekaligus
+@router.put("/courses/{course_id}/lessons/order", response_model=List[schemas.LessonPublicDisplay])
+def reorder_lessons(
+    course_id: int,
+    request: schemas.LessonReorder,
+    db: Session = Depends(get_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
+):
+    _get_own_course(db, course_id, current_user)
+
+    current_ids = db.query(models.Lesson.id).filter(models.Lesson.course_id == course_id).all()
+    if len(request.lesson_ids) != len(set(request.lesson_ids)) or \
+            set(request.lesson_ids) != {lesson.id for lesson in current_ids}:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="lesson_ids must list every lesson of this course exactly once."
+        )
+
+    lesson_order.apply_order(db, request.lesson_ids)
+    db.commit()
+    cache.response_cache.invalidate(f"course:{course_id}")
+
+    return lesson_order.course_lessons(db, course_id)
+
 # Endpoint untuk melihat semua lesson (Publik)
 @router.get("/courses/{course_id}/lessons", response_model=List[schemas.LessonPublicDisplay])
-def get_lessons_for_course(course_id: int, db: Session = Depends(get_db)):
-    lessons = db.query(models.Lesson).filter(models.Lesson.course_id == course_id).order_by(models.Lesson.order).all()
-    return lessons
+def get_lessons_for_course(course_id: int, request: Request, db: Session = Depends(get_read_db)):
+    def build():
+        lessons = lesson_order.course_lessons(db, course_id)
+        return lessons, {f"course:{course_id}"}
+
+    return cache.cached_json(request, List[schemas.LessonPublicDisplay], build)
 
 # Endpoint untuk melihat detail satu lesson (Terproteksi)
 @router.get("/lessons/{lesson_id}", response_model=schemas.LessonDisplay)
 def get_lesson_detail(
     lesson_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
 ):
-    lesson = db.query(models.Lesson).filter(models.Lesson.id == lesson_id).first()
+    # Kursus ikut di-JOIN: dibutuhkan untuk cek pemilik, tanpa query lazy tambahan
+    lesson = db.query(models.Lesson).options(joinedload(models.Lesson.course)).filter(
+        models.Lesson.id == lesson_id
+    ).first()
     if not lesson:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found.")
 
@@ -80,7 +127,7 @@ def partial_update_lesson(
     lesson_id: int,
     request: schemas.LessonUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
 ):
     lesson_query = db.query(models.Lesson).filter(models.Lesson.id == lesson_id)
     lesson = lesson_query.first()
@@ -93,30 +140,19 @@ def partial_update_lesson(
 
     update_data = request.model_dump(exclude_unset=True)
 
-    #Jika nomor urut diubah
-    if 'order' in update_data and update_data['order'] != lesson.order:
-        old_order = lesson.order
-        new_order = update_data['order']
-        course_id = lesson.course_id
-        
-        if new_order < old_order: # Bergerak ke atas 
-            # Geser ke bawah pelajaran di antara posisi baru dan lama
-            db.query(models.Lesson).filter(
-                models.Lesson.course_id == course_id,
-                models.Lesson.order >= new_order,
-                models.Lesson.order < old_order
-            ).update({"order": models.Lesson.order + 1})
-        else: # Bergerak ke bawah (misal dari 2 ke 5)
-            
-            db.query(models.Lesson).filter(
-                models.Lesson.course_id == course_id,
-                models.Lesson.order > old_order,
-                models.Lesson.order <= new_order
-            ).update({"order": models.Lesson.order - 1})
-    # ------------------------------------------
-
-    lesson_query.update(update_data, synchronize_session=False)
+    # Jika nomor urut diubah, cukup lesson ini yang mendapat posisi baru
+    new_order = update_data.pop('order', None)
+    if new_order is not None and new_order != lesson.order:
+        update_data['position'] = lesson_order.position_for(
+            db, lesson.course_id, new_order, exclude_id=lesson.id
+        )
+
+    if update_data:
+        lesson_query.update(update_data, synchronize_session=False)
+    if 'title' in update_data:
+        fulltext.reindex_course(db, lesson.course_id)
     db.commit()
+    cache.response_cache.invalidate(f"course:{lesson.course_id}", "courses:search")
 
     return lesson_query.first()
 
@@ -125,7 +161,7 @@ def partial_update_lesson(
 def delete_lesson(
     lesson_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    current_user: schemas.Principal = Depends(oauth2.get_current_principal)
 ):
     lesson = db.query(models.Lesson).filter(models.Lesson.id == lesson_id).first()
 
@@ -135,18 +171,12 @@ def delete_lesson(
     if lesson.course.instruktur_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to perform this action.")
         
-    order_to_remove = lesson.order
     course_id_to_update = lesson.course_id
 
-    
+    # Nomor urut lesson lain ikut bergeser dengan sendirinya (dihitung dari position)
     db.delete(lesson)
-    # -------------------------------
-    
-    # Geser ke atas semua pelajaran yang urutannya di atas yang dihapus
-    db.query(models.Lesson).filter(
-        models.Lesson.course_id == course_id_to_update,
-        models.Lesson.order > order_to_remove
-    ).update({"order": models.Lesson.order - 1})
 
+    fulltext.reindex_course(db, course_id_to_update)
     db.commit()
+    cache.response_cache.invalidate(f"course:{course_id_to_update}", "courses:search")
     return
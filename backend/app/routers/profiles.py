@@ -0,0 +1,31 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from app import profiling
+
+router = APIRouter(
+    prefix="/profiles",
+    tags=["Profiles"]
+)
+
+# Profil yang tersimpan hanya untuk admin (header X-Profile-Token, sama dengan pemicu profiling)
+def require_profile_admin(x_profile_token: Optional[str] = Header(None)):
+    if not profiling.is_admin(x_profile_token):
+        # 404 agar keberadaan endpoint tidak terlihat tanpa token
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+@router.get("/", response_model=List[str], dependencies=[Depends(require_profile_admin)])
+def list_profiles():
+    return profiling.list_profiles()
+
+
+# format=folded mengembalikan folded stacks saja, siap untuk flamegraph.pl / speedscope
+@router.get("/{profile_id}", dependencies=[Depends(require_profile_admin)])
+def get_profile(profile_id: str, format: str = Query("json", pattern="^(json|folded)$")):
+    profile = profiling.load_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Profile {profile_id} not found")
+    if format == "folded":
+        return PlainTextResponse(profile["folded"])
+    return profile
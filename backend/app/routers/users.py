@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app import schemas, models, hashing 
+from app import schemas, models, hashing, cache
 from app.database import get_db
 from app import oauth2
 from app import jwt
@@ -11,9 +12,7 @@ router = APIRouter(
     tags=["Users"]
 )
 
-# Endpoint untuk registrasi user baru
-@router.post("/register", response_model=schemas.UserDisplay)
-def register_user(request: schemas.UserCreate, db: Session = Depends(get_db)):
+def _check_new_user(db: Session, request: schemas.UserCreate):
     # Cek apakah email sudah terdaftar
     user_by_email = db.query(models.User).filter(models.User.email == request.email).first()
     if user_by_email:
@@ -26,8 +25,8 @@ def register_user(request: schemas.UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail=f"Username '{request.username}' is already taken.")
 
-    hashed_pwd = hashing.hash_password(request.password)
 
+def _create_user(db: Session, request: schemas.UserCreate, hashed_pwd: str):
     new_user = models.User(
         name=request.name,
         username=request.username, 
@@ -40,6 +39,14 @@ def register_user(request: schemas.UserCreate, db: Session = Depends(get_db)):
     db.refresh(new_user)
     return new_user
 
+# Endpoint untuk registrasi user baru.
+# async def: query di threadpool, bcrypt ditunggu (await) di pool hashing (lihat app/hashing.py)
+@router.post("/register", response_model=schemas.UserDisplay)
+async def register_user(request: schemas.UserCreate, db: Session = Depends(get_db)):
+    await run_in_threadpool(_check_new_user, db, request)
+    hashed_pwd = await hashing.hash_password_async(request.password)
+    return await run_in_threadpool(_create_user, db, request, hashed_pwd)
+
 @router.get("/me", response_model=schemas.UserDisplay)
 def get_user_details(current_user: models.User = Depends(oauth2.get_current_user)):
     return current_user
@@ -60,8 +67,9 @@ def become_instructor(
     db.add(user)
     db.commit()
     db.refresh(user)
+    oauth2.evict_principal(user.email)
 
-    data = {"sub": user.email, "role": user.role.value}
+    data = {"sub": user.email, "role": user.role.value, "uid": user.id}
     new_access_token = jwt.create_access_token(data=data)
 
     return {
@@ -77,6 +85,7 @@ def update_user_details(
     current_user: models.User = Depends(oauth2.get_current_user)
 ):
     user_to_update = current_user
+    old_email = user_to_update.email
 
     
     update_data = request.model_dump(exclude_unset=True)
@@ -99,6 +108,8 @@ def update_user_details(
 
     # --- JIKA SEMUA PENGECEKAN AMAN, LANJUTKAN UPDATE ---
 
+    username_changed = update_data.get("username", user_to_update.username) != user_to_update.username
+
     # Update setiap field yang ada di update_data
     for key, value in update_data.items():
         setattr(user_to_update, key, value)
@@ -106,11 +117,26 @@ def update_user_details(
     db.add(user_to_update)
     db.commit()
     db.refresh(user_to_update)
+    oauth2.evict_principal(old_email)
+
+    # Respons kursus yang di-cache memuat instruktur_username: buang entri kursus milik user ini
+    if username_changed:
+        course_ids = db.query(models.Course.id).filter(models.Course.instruktur_id == user_to_update.id).all()
+        if course_ids:
+            cache.response_cache.invalidate(*(f"course:{course_id}" for course_id, in course_ids))
 
     return user_to_update
     
+def _save_password(db: Session, user: models.User, new_hashed_password: str):
+    email = user.email
+    user.hashed_password = new_hashed_password
+    db.add(user)
+    db.commit()
+    oauth2.evict_principal(email)
+
+
 @router.put("/me/change-password", status_code=status.HTTP_202_ACCEPTED)
-def change_password(
+async def change_password(
     request: schemas.UserChangePassword,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(oauth2.get_current_user)
@@ -118,16 +144,14 @@ def change_password(
     user = current_user
 
     # 1. Verifikasi password saat ini
-    if not hashing.verify_password(request.current_password, user.hashed_password):
+    if not await hashing.verify_password_async(request.current_password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Incorrect current password.")
 
     # 2. Jika password saat ini benar, hash password yang baru
-    new_hashed_password = hashing.hash_password(request.new_password)
+    new_hashed_password = await hashing.hash_password_async(request.new_password)
 
-    # 3. Update password di database
-    user.hashed_password = new_hashed_password
-    db.add(user)
-    db.commit()
+    # 3. Update password di database (di threadpool, seperti query lainnya)
+    await run_in_threadpool(_save_password, db, user, new_hashed_password)
 
-    return {"message": "Password updated successfully."}
\ No newline at end of file
+    return {"message": "Password updated successfully."}
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional
+from datetime import date, datetime
 
 
 import enum
@@ -35,6 +35,18 @@ class UserChangePassword(BaseModel):
     current_password: str
     new_password: str = Field(..., min_length=8)
 
+# Data yang dibaca dari token JWT
+class TokenData(BaseModel):
+    email: str
+    id: Optional[int] = None
+    role: Optional[UserRole] = None
+
+# Identitas ringan user yang sedang login (tanpa objek ORM)
+class Principal(BaseModel):
+    id: int
+    email: str
+    role: UserRole
+
 class Category(BaseModel):
     id: int
     name: str
@@ -86,6 +98,58 @@ class LessonUpdate(BaseModel):
     video_url: Optional[str] = None
     content: Optional[str] = None
 
+# Skema untuk menyusun ulang seluruh daftar isi: semua id lesson kursus, sesuai urutan baru
+class LessonReorder(BaseModel):
+    lesson_ids: List[int]
+
+# Skema impor katalog massal (satu baris NDJSON = satu kursus beserta lesson-nya).
+# Urutan lesson mengikuti urutan di dalam daftar.
+class LessonImport(BaseModel):
+    title: str
+    video_url: Optional[str] = None
+    content: Optional[str] = None
+
+class CourseImport(CourseBase):
+    lessons: List[LessonImport] = []
+
+class CatalogImportError(BaseModel):
+    row: int  # nomor baris NDJSON / nomor baris pertama kursus di CSV
+    title: Optional[str] = None
+    detail: str
+
+class CatalogImportResult(BaseModel):
+    courses_imported: int
+    lessons_imported: int
+    courses_failed: int
+    # Dibatasi CATALOG_IMPORT_MAX_ERRORS; errors_truncated=True jika ada yang tidak dicantumkan
+    errors: List[CatalogImportError]
+    errors_truncated: bool = False
+
+# Skema aksi massal: daftar / favoritkan banyak kursus dalam satu request
+class CourseBatch(BaseModel):
+    course_ids: List[int] = Field(..., min_length=1, max_length=100)
+
+class CourseBatchStatus(str, enum.Enum):
+    created = "created"
+    already_present = "already_present"
+    not_found = "not_found"
+    own_course = "own_course"  # hanya untuk pendaftaran: instruktur tidak bisa mendaftar ke kursusnya sendiri
+
+class CourseBatchItem(BaseModel):
+    course_id: int
+    status: CourseBatchStatus
+
+class CourseBatchResult(BaseModel):
+    created: int
+    # Satu entri per id unik, sesuai urutan di request
+    results: List[CourseBatchItem]
+
+# Status user untuk satu kursus (penanda di kartu kursus)
+class CourseUserStatus(BaseModel):
+    course_id: int
+    enrolled: bool
+    favorited: bool
+
 # Skema untuk menampilkan data Kursus secara lengkap
 
 class CourseDisplay(CourseBase):
@@ -96,6 +160,11 @@ class CourseDisplay(CourseBase):
     lessons: List[LessonPublicDisplay] = [] 
     enrollment_count: int
     thumbnail_url: Optional[str] = None
+    # Versi thumbnail yang diperkecil, mis. {"webp_320": url, "jpeg_640": url};
+    # None selama belum dibuat (pakai thumbnail_url)
+    thumbnail_variants: Optional[Dict[str, str]] = None
+    # Hanya terisi pada hasil pencarian: potongan teks dengan kata yang cocok ditandai <mark>
+    search_snippet: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -112,6 +181,40 @@ class PaginatedCourseDisplay(BaseModel):
     total_pages: int
     current_page: int
     results: List[CourseDisplay]
+
+# Skema untuk paginasi berbasis cursor (keyset)
+class CursorCourseDisplay(BaseModel):
+    results: List[CourseDisplay]
+    next_cursor: Optional[str] = None
+    total_items: Optional[int] = None
+
+class CursorEnrolledCourseDisplay(BaseModel):
+    results: List[EnrolledCourseDisplay]
+    next_cursor: Optional[str] = None
+    total_items: Optional[int] = None
         
 
         
+
+# Skema analitik instruktur (rollup harian, lihat app/analytics.py)
+class CourseActivityTotals(BaseModel):
+    enrollments: int = 0
+    unenrollments: int = 0
+    favorites: int = 0
+    unfavorites: int = 0
+
+class CourseActivityPoint(CourseActivityTotals):
+    period: date  # awal periode: hari, Senin (week), atau tanggal 1 (month)
+
+class CourseActivitySeries(BaseModel):
+    course_id: int
+    title: str
+    totals: CourseActivityTotals
+    # Satu titik per periode di rentang yang diminta, termasuk periode tanpa aktivitas
+    series: List[CourseActivityPoint]
+
+class CourseAnalytics(BaseModel):
+    start: date
+    end: date
+    interval: str
+    courses: List[CourseActivitySeries]
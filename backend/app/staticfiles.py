@@ -0,0 +1,149 @@
+import gzip
+import mimetypes
+import os
+import re
+import stat
+from typing import Optional
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+
+# Penyajian /static yang ramah cache.
+# - File yang namanya ditentukan isinya (hash SHA-256 dari app/uploads.py, atau UUID
+#   dari upload lama) tidak pernah berubah: dikirim dengan Cache-Control immutable dan
+#   ETag kuat berupa nama file, sehingga If-None-Match dijawab 304 cukup dengan satu
+#   stat (memastikan file masih ada) tanpa membuka file.
+# - File lain memakai ETag bawaan Starlette dengan Cache-Control: no-cache (revalidasi).
+# - Jika klien menerima br/gzip dan ada file saudara `.br`/`.gz`, file itu yang dikirim,
+#   dengan ETag sendiri per encoding ("<tag>+br" / "<tag>+gzip").
+# FileResponse memakai ekstensi ASGI `http.response.pathsend` (zero-copy) bila server
+# mendukungnya; jika tidak, file dikirim per chunk seperti biasa.
+
+STATIC_IMMUTABLE_MAX_AGE = int(os.getenv("STATIC_IMMUTABLE_MAX_AGE", str(365 * 24 * 3600)))
+STATIC_CACHE_CONTROL = os.getenv("STATIC_CACHE_CONTROL", "no-cache")
+
+_CONTENT_NAMED = re.compile(
+    r"^(?:[0-9a-f]{64}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})[.-]"
+)
+# Urutan = prioritas
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+# Tipe file yang layak dikompresi lebih dulu (gambar sudah terkompresi)
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".mjs", ".json", ".svg", ".txt", ".html", ".xml", ".map"}
+
+
+def _accepted_encodings(request_headers: Headers) -> set:
+    accepted = set()
+    for item in request_headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q=") and quality[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _entity_tag(etag: str, encoding: Optional[str]) -> str:
+    # Representasi terkompresi tidak boleh berbagi ETag kuat dengan file aslinya
+    return f'{etag[:-1]}+{encoding}"' if encoding else etag
+
+
+def _matching_etag(request_headers: Headers, name: str, accepted: set):
+    # Tag representasi terkompresi hanya cocok jika klien masih menerima encoding-nya
+    for tag in request_headers.get("if-none-match", "").split(","):
+        tag = tag.strip().removeprefix("W/")
+        base, _, encoding = tag.strip('"').partition("+")
+        if base == name and (not encoding or encoding in accepted):
+            return tag
+    return None
+
+
+class CachedStaticFiles(StaticFiles):
+    async def get_response(self, path: str, scope) -> Response:
+        name = os.path.basename(path)
+        immutable = bool(_CONTENT_NAMED.match(name))
+        cache_control = (f"public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable"
+                         if immutable else STATIC_CACHE_CONTROL)
+        request_headers = Headers(scope=scope)
+
+        if immutable and scope["method"] in ("GET", "HEAD"):
+            etag = _matching_etag(request_headers, name, _accepted_encodings(request_headers))
+            if etag is not None:
+                # File yang sudah dihapus harus dijawab 404, bukan 304
+                _, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+                if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+                    return Response(status_code=304, headers={
+                        "etag": etag, "cache-control": cache_control, "vary": "Accept-Encoding"
+                    })
+
+        response = await self._precompressed_response(path, scope, request_headers)
+        if response is None:
+            response = await super().get_response(path, scope)
+            encoding = None
+        else:
+            encoding = response.headers["content-encoding"]
+
+        if response.status_code in (200, 304):
+            response.headers["cache-control"] = cache_control
+            response.headers["vary"] = "Accept-Encoding"
+            if immutable:
+                response.headers["etag"] = _entity_tag(f'"{name}"', encoding)
+        return response
+
+    async def _precompressed_response(self, path: str, scope, request_headers: Headers):
+        if scope["method"] not in ("GET", "HEAD") or "range" in request_headers:
+            return None
+        accepted = _accepted_encodings(request_headers)
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+
+            media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            response = FileResponse(
+                full_path, stat_result=stat_result, media_type=media_type,
+                headers={"content-encoding": encoding}
+            )
+            response.headers["etag"] = _entity_tag(response.headers["etag"], encoding)
+            if self.is_not_modified(response.headers, request_headers):
+                return Response(status_code=304, headers={
+                    "etag": response.headers["etag"], "content-encoding": encoding
+                })
+            return response
+        return None
+
+
+def precompress(directory: str) -> int:
+    """
+    Membuat file saudara .gz (dan .br jika paket brotli terpasang) untuk file yang
+    bisa dikompresi di `directory`. File yang sudah up to date dilewati.
+    Mengembalikan jumlah file yang ditulis.
+    """
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    written = 0
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if os.path.splitext(filename)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            source = os.path.join(root, filename)
+            source_mtime = os.stat(source).st_mtime
+            for suffix, compress in ((".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0)),
+                                     (".br", brotli and (lambda data: brotli.compress(data, quality=11)))):
+                target = source + suffix
+                if compress is None or (os.path.exists(target) and os.stat(target).st_mtime >= source_mtime):
+                    continue
+                with open(source, "rb") as source_file:
+                    data = compress(source_file.read())
+                temp_path = f"{target}.part"
+                with open(temp_path, "wb") as target_file:
+                    target_file.write(data)
+                os.replace(temp_path, target)
+                written += 1
+    return written
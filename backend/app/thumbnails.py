@@ -0,0 +1,212 @@
+import importlib.util
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app import cache, models
+from app.database import SessionLocal
+from app.uploads import THUMBNAIL_DIR, path_to_url, url_to_path
+
+# Thumbnail kursus: jumlah pemakai (ref count) dan varian yang sudah diperkecil.
+# File asli disimpan content-addressed oleh app/uploads.py. Setiap kursus yang
+# memakai file itu menambah `Thumbnail.ref_count`; file (beserta variannya) baru
+# dihapus saat tidak ada kursus yang memakainya lagi.
+# Urutan yang mencegah file terhapus padahal baru dipakai lagi oleh kursus lain:
+# - pemakai baru: acquire() lalu uploads.store_thumbnail() di transaksi yang sama;
+# - pemakai terakhir: release() menghapus baris, commit, lalu remove_released() yang
+#   menghapus file hanya jika barisnya masih tidak ada, sambil memegang write lock.
+# Varian WebP/JPEG dibuat di process pool setelah respons terkirim (background task),
+# lalu URL-nya disalin ke `Course.thumbnail_variants` agar daftar kursus tidak perlu JOIN.
+# Pembuatan varian membutuhkan Pillow; tanpa Pillow hanya file asli yang dipakai.
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = f"{THUMBNAIL_DIR}/variants"
+THUMBNAIL_VARIANT_WIDTHS = [int(width) for width in os.getenv("THUMBNAIL_VARIANT_WIDTHS", "320,640").split(",")]
+THUMBNAIL_VARIANT_FORMATS = ("webp", "jpeg")
+THUMBNAIL_VARIANT_QUALITY = int(os.getenv("THUMBNAIL_VARIANT_QUALITY", "80"))
+THUMBNAIL_POOL_SIZE = int(os.getenv("THUMBNAIL_POOL_SIZE", "2"))
+
+_executor = None
+_pending = set()
+_lock = threading.Lock()
+_pillow_available = importlib.util.find_spec("PIL") is not None
+if not _pillow_available:
+    logger.warning("Pillow is not installed; thumbnail variants will not be generated.")
+
+
+# --- Ref count (dipanggil di dalam transaksi yang mengubah kursus) ---
+
+def acquire(db: Session, name: str) -> Optional[Dict[str, str]]:
+    """Menambah pemakai thumbnail `name`. Mengembalikan varian yang sudah ada (jika ada)."""
+    return db.execute(
+        sqlite_insert(models.Thumbnail)
+        .values(name=name, ref_count=1)
+        .on_conflict_do_update(
+            index_elements=["name"],
+            set_={"ref_count": models.Thumbnail.ref_count + 1}
+        )
+        .returning(models.Thumbnail.variants)
+    ).scalar_one()
+
+
+def release(db: Session, name: str) -> List[str]:
+    """
+    Mengurangi pemakai thumbnail `name`. Jika tidak ada pemakai lagi, barisnya dihapus
+    dan path file yang harus dihapus (setelah commit) dikembalikan.
+    """
+    row = db.execute(
+        update(models.Thumbnail)
+        .where(models.Thumbnail.name == name)
+        .values(ref_count=models.Thumbnail.ref_count - 1)
+        .returning(models.Thumbnail.ref_count, models.Thumbnail.variants)
+    ).first()
+    if row is None or row.ref_count > 0:
+        return []
+
+    db.execute(delete(models.Thumbnail).where(models.Thumbnail.name == name))
+    return [f"{THUMBNAIL_DIR}/{name}"] + [url_to_path(url) for url in (row.variants or {}).values()]
+
+
+def remove_released(db: Session, name: str, paths: List[str]):
+    """
+    Dipanggil setelah commit transaksi yang membuat release(name) mengembalikan `paths`.
+    Kursus lain bisa memakai gambar yang sama lagi setelah commit itu, jadi file hanya
+    dihapus jika baris thumbnail-nya masih tidak ada. DELETE di bawah mengambil write lock
+    SQLite sampai commit, sehingga acquire() + store_thumbnail() di request lain menunggu
+    (atau sudah selesai dan barisnya terlihat) selama cek dan penghapusan file berlangsung.
+    """
+    db.execute(delete(models.Thumbnail).where(models.Thumbnail.name == name, models.Thumbnail.ref_count <= 0))
+    in_use = db.execute(select(models.Thumbnail.name).where(models.Thumbnail.name == name)).first()
+    if in_use is None:
+        remove_files(paths)
+    db.commit()
+
+
+def remove_files(paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# --- Pembuatan varian ---
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=THUMBNAIL_POOL_SIZE)
+        return _executor
+
+
+def _render_variants(source_path: str, name: str, widths: List[int], formats, quality: int) -> Dict[str, str]:
+    # Dijalankan di proses worker
+    from PIL import Image, ImageOps
+
+    stem = name.replace(".", "-")
+    variants = {}
+    os.makedirs(VARIANTS_DIR, exist_ok=True)
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        for width in widths:
+            resized = image
+            # Tidak memperbesar gambar yang lebih kecil dari lebar varian
+            if image.width > width:
+                resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+            for image_format in formats:
+                if image_format == "jpeg":
+                    converted = resized.convert("RGB")
+                else:
+                    has_alpha = "A" in resized.getbands() or resized.mode == "P"
+                    converted = resized.convert("RGBA" if has_alpha else "RGB")
+
+                path = f"{VARIANTS_DIR}/{stem}-{width}.{'jpg' if image_format == 'jpeg' else image_format}"
+                temp_path = f"{path}.part"
+                converted.save(temp_path, format=image_format.upper(), quality=quality)
+                os.replace(temp_path, path)
+                variants[f"{image_format}_{width}"] = path
+    return variants
+
+
+def _store_variants(name: str, future: Future):
+    with _lock:
+        _pending.discard(name)
+    try:
+        paths = future.result()
+    except FileNotFoundError:
+        # File asli sudah dihapus (thumbnail diganti) sebelum varian sempat dibuat
+        return
+    except Exception:
+        logger.warning("Could not generate variants for thumbnail %s", name, exc_info=True)
+        return
+
+    variants = {key: path_to_url(path) for key, path in paths.items()}
+    db = SessionLocal()
+    try:
+        stored = db.execute(
+            update(models.Thumbnail)
+            .where(models.Thumbnail.name == name)
+            .values(variants=variants)
+            .returning(models.Thumbnail.name)
+        ).first()
+        if stored is None:
+            # Thumbnail sudah tidak dipakai selama varian dibuat
+            db.rollback()
+            remove_files(list(paths.values()))
+            return
+        course_ids = db.execute(
+            update(models.Course)
+            .where(models.Course.thumbnail_name == name)
+            .values(thumbnail_variants=variants)
+            .returning(models.Course.id)
+        ).scalars().all()
+        db.commit()
+    finally:
+        db.close()
+
+    if course_ids:
+        cache.response_cache.invalidate(*(f"course:{course_id}" for course_id in course_ids))
+
+
+def generate_variants(name: str):
+    """
+    Background task: membuat varian untuk thumbnail `name` bila belum ada.
+    Hanya mengirim tugas ke process pool; tidak menunggu hasilnya.
+    """
+    if not _pillow_available:
+        return
+
+    db = SessionLocal()
+    try:
+        variants = db.execute(
+            select(models.Thumbnail.variants).where(models.Thumbnail.name == name)
+        ).first()
+    finally:
+        db.close()
+    if variants is None or variants[0] is not None:
+        return
+
+    with _lock:
+        if name in _pending:
+            return
+        _pending.add(name)
+
+    future = _get_executor().submit(
+        _render_variants, f"{THUMBNAIL_DIR}/{name}", name,
+        THUMBNAIL_VARIANT_WIDTHS, THUMBNAIL_VARIANT_FORMATS, THUMBNAIL_VARIANT_QUALITY
+    )
+    future.add_done_callback(lambda done: _store_variants(name, done))
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
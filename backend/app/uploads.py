@@ -0,0 +1,185 @@
+import hashlib
+import os
+import tempfile
+from typing import NamedTuple
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+# Penyimpanan file upload (thumbnail kursus).
+# File ditulis per potongan (chunk) di threadpool sehingga event loop tidak ikut
+# menunggu disk, ke file sementara di folder tujuan, lalu di-rename secara atomik.
+# Nama file diambil dari hash SHA-256 isinya (content-addressed) dan ekstensi dari
+# jenis gambar yang terdeteksi (bukan nama file klien), sehingga gambar yang sama
+# hanya tersimpan sekali; jumlah pemakainya dicatat di app/thumbnails.py.
+# File sementara baru dipindah ke nama akhirnya oleh store_thumbnail(), di dalam
+# transaksi yang sudah mencatat pemakainya (lihat thumbnails.acquire()).
+# Upload yang melewati batas ukuran dihentikan sedini mungkin (lihat juga
+# UploadSizeLimitMiddleware yang membatasi body request sebelum form diparsing).
+
+THUMBNAIL_DIR = "static/images"
+STATIC_BASE_URL = "http://localhost:8000"
+THUMBNAIL_MAX_BYTES = int(os.getenv("THUMBNAIL_MAX_BYTES", str(5 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(256 * 1024)))
+# Body multipart = file + field form + boundary, jadi diberi sedikit kelonggaran
+UPLOAD_REQUEST_MAX_BYTES = int(os.getenv("UPLOAD_REQUEST_MAX_BYTES", str(THUMBNAIL_MAX_BYTES + 64 * 1024)))
+
+# Signature (magic bytes) jenis gambar yang dikenali -> ekstensi file
+_IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"File is too large. Maximum size is {THUMBNAIL_MAX_BYTES} bytes."
+    )
+
+
+def _image_extension(head: bytes) -> str:
+    # Isi yang sama selalu mendapat nama yang sama, apa pun ekstensi yang dikirim klien
+    for signature, extension in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return ""
+
+
+class SavedThumbnail(NamedTuple):
+    name: str  # <sha256><ekstensi>, juga kunci tabel thumbnails
+    url: str
+    temp_path: str  # Salinan sementara sampai store_thumbnail() dipanggil
+
+
+def _write_chunk(buffer, digest, chunk: bytes):
+    digest.update(chunk)
+    buffer.write(chunk)
+
+
+def _store(temp_path: str, final_path: str):
+    # File dengan isi yang sama sudah ada: cukup buang salinan sementara
+    if os.path.exists(final_path):
+        os.remove(temp_path)
+    else:
+        # Rename atomik: pembaca tidak pernah melihat file yang setengah tertulis
+        os.replace(temp_path, final_path)
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def path_to_url(path: str) -> str:
+    return f"{STATIC_BASE_URL}/{path}"
+
+
+def url_to_path(url: str) -> str:
+    # Kebalikan dari path_to_url
+    return url.replace(f"{STATIC_BASE_URL}/", "")
+
+
+async def save_thumbnail(file: UploadFile) -> SavedThumbnail:
+    """
+    Menyalin file upload ke file sementara di THUMBNAIL_DIR dan menentukan namanya
+    dari hash isinya. File belum dipindah ke nama akhirnya: panggil store_thumbnail()
+    setelah thumbnails.acquire(), lalu discard_thumbnail() untuk membersihkan sisa.
+    """
+    # Ukuran sudah diketahui setelah form diparsing: tolak tanpa menyalin apa pun
+    if file.size is not None and file.size > THUMBNAIL_MAX_BYTES:
+        raise _too_large()
+
+    digest = hashlib.sha256()
+    fd, temp_path = await run_in_threadpool(tempfile.mkstemp, dir=THUMBNAIL_DIR, suffix=".part")
+    try:
+        written = 0
+        head = b""
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if not written:
+                    head = chunk[:16]
+                written += len(chunk)
+                if written > THUMBNAIL_MAX_BYTES:
+                    raise _too_large()
+                await run_in_threadpool(_write_chunk, buffer, digest, chunk)
+        name = f"{digest.hexdigest()}{_image_extension(head)}"
+    except BaseException:
+        _remove_quietly(temp_path)
+        raise
+
+    return SavedThumbnail(name=name, url=path_to_url(f"{THUMBNAIL_DIR}/{name}"), temp_path=temp_path)
+
+
+def store_thumbnail(thumbnail: SavedThumbnail):
+    """
+    Memindahkan file sementara ke nama akhirnya (jika belum ada). Harus dipanggil di
+    dalam transaksi yang sudah menjalankan thumbnails.acquire(): write lock transaksi itu
+    mencegah thumbnails.remove_released() menghapus file di antara cek dan commit.
+    """
+    if os.path.exists(thumbnail.temp_path):
+        _store(thumbnail.temp_path, f"{THUMBNAIL_DIR}/{thumbnail.name}")
+
+
+def discard_thumbnail(thumbnail: SavedThumbnail):
+    # Membuang file sementara yang tidak jadi dipakai (no-op setelah store_thumbnail())
+    _remove_quietly(thumbnail.temp_path)
+
+
+async def remove_file(path: str):
+    await run_in_threadpool(_remove_quietly, path)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Membatasi ukuran body request multipart sebelum diparsing oleh FastAPI.
+    Content-Length yang terlalu besar langsung ditolak (413); body tanpa
+    Content-Length (chunked) dihitung saat dibaca dan dihentikan begitu melewati batas.
+    """
+
+    def __init__(self, app, max_bytes: int = UPLOAD_REQUEST_MAX_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse(
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                content={"detail": f"Request body is too large. Maximum size is {self.max_bytes} bytes."},
+                headers={"Connection": "close"},
+            )
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # FastAPI meneruskan HTTPException dari pembacaan body apa adanya
+                    raise HTTPException(
+                        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                        detail=f"Request body is too large. Maximum size is {self.max_bytes} bytes."
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,40 @@
+import os
+import sys
+import tempfile
+
+# Jalankan aplikasi di folder sementara agar benchmark tidak menyentuh course_app.db asli.
+# Modul ini harus diimpor SEBELUM modul `app` mana pun.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Direktori asal pemanggil, untuk path file yang diberikan lewat argumen CLI
+ORIGINAL_CWD = os.getcwd()
+WORK_DIR = tempfile.mkdtemp(prefix="course-bench-")
+os.makedirs(os.path.join(WORK_DIR, "static", "images"), exist_ok=True)
+os.chdir(WORK_DIR)
+
+
+def user_path(path: str) -> str:
+    return os.path.join(ORIGINAL_CWD, path)
+
+
+def database_path() -> str:
+    # Sesuai DATABASE_URL default (sqlite:///./course_app.db) relatif terhadap WORK_DIR
+    return os.path.join(WORK_DIR, "course_app.db")
+
+
+def use_dataset(path: str):
+    """Menyalin database dataset (dari benchmarks.dataset --output) sebelum load_app()."""
+    import sqlite3
+
+    if not os.path.isfile(user_path(path)):
+        raise SystemExit(f"dataset not found: {path}")
+    with sqlite3.connect(user_path(path)) as source, sqlite3.connect(database_path()) as target:
+        source.backup(target)
+
+
+def load_app():
+    from app import main
+    main.on_startup()
+    return main.app
@@ -0,0 +1,187 @@
+"""
+Generator dataset sintetis untuk benchmark (deterministik untuk --seed yang sama).
+
+    python -m benchmarks.dataset --courses 100000 --lessons 50 --enrollments 1000000 --output big.db
+
+Tanpa --output, dataset dibuat di database sementara milik benchmarks._app.
+File hasil --output bisa dipakai ulang oleh `python -m benchmarks.load --dataset big.db`
+(disalin dulu, sehingga file aslinya tidak ikut berubah oleh skenario yang menulis).
+
+Baris disisipkan langsung lewat executemany per batch (tanpa objek ORM), lalu
+enrollment_count dan index FTS dihitung ulang sekali di akhir.
+"""
+import argparse
+import os
+import random
+import time
+
+from benchmarks import _app
+
+PASSWORD = "benchmark-password"
+BATCH_SIZE = 10_000
+# Kosakata judul agar skenario pencarian menemukan hasil
+TOPICS = ["python", "javascript", "desain", "pemasaran", "bisnis", "fotografi", "data", "keuangan",
+          "musik", "olahraga", "react", "fastapi", "sql", "ilustrasi", "copywriting", "excel"]
+LEVELS = ["dasar", "menengah", "lanjutan", "praktis", "lengkap", "kilat"]
+
+
+def instructor_username(index: int) -> str:
+    return f"instruktur{index}"
+
+
+def student_username(index: int) -> str:
+    return f"siswa{index}"
+
+
+def _batches(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(db, table, rows) -> int:
+    from sqlalchemy import insert
+
+    count = 0
+    for batch in _batches(rows):
+        db.execute(insert(table), batch)
+        count += len(batch)
+    return count
+
+
+def _unique_pairs(rng: random.Random, users: int, courses: int, count: int):
+    # Pasangan (user, course) unik: sampel tanpa pengembalian dari ruang users x courses
+    count = min(count, users * courses)
+    for cell in sorted(rng.sample(range(users * courses), count)):
+        yield cell // courses, cell % courses
+
+
+def generate(courses: int = 2000, lessons: int = 20, students: int = 5000, instructors: int = 100,
+             enrollments: int = 50_000, favorites: int = 10_000, seed: int = 42) -> dict:
+    """
+    Mengisi database aplikasi (harus sudah melewati startup) dan mengembalikan
+    ringkasan jumlah baris. Semua user memakai password PASSWORD.
+    """
+    from sqlalchemy import text
+    from app import analytics, fulltext, hashing, lesson_order, models
+    from app.database import SessionLocal
+
+    rng = random.Random(seed)
+    # Satu hash untuk semua user: bcrypt per baris akan mendominasi waktu generate
+    hashed_password = hashing.hash_password(PASSWORD)
+    started = time.perf_counter()
+
+    db = SessionLocal()
+    try:
+        user_table = models.User.__table__
+        _insert(db, user_table, (
+            {"name": f"Instruktur {index}", "username": instructor_username(index),
+             "email": f"{instructor_username(index)}@example.com", "hashed_password": hashed_password,
+             "role": models.UserRole.instruktur}
+            for index in range(instructors)
+        ))
+        _insert(db, user_table, (
+            {"name": f"Siswa {index}", "username": student_username(index),
+             "email": f"{student_username(index)}@example.com", "hashed_password": hashed_password,
+             "role": models.UserRole.siswa}
+            for index in range(students)
+        ))
+        first_instructor_id = db.execute(
+            text("SELECT id FROM users WHERE username = :name"), {"name": instructor_username(0)}
+        ).scalar_one()
+        first_student_id = db.execute(
+            text("SELECT id FROM users WHERE username = :name"), {"name": student_username(0)}
+        ).scalar_one()
+        category_ids = [row[0] for row in db.execute(text("SELECT id FROM categories ORDER BY id"))]
+
+        offset = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM courses")).scalar_one()
+        _insert(db, models.Course.__table__, (
+            {"id": offset + index + 1,
+             "title": f"{rng.choice(TOPICS).title()} {rng.choice(LEVELS)} {index}",
+             "description": f"Belajar {rng.choice(TOPICS)} dan {rng.choice(TOPICS)} dari nol. " * 2,
+             "category_id": category_ids[index % len(category_ids)],
+             "instruktur_id": first_instructor_id + index % instructors}
+            for index in range(courses)
+        ))
+        _insert(db, models.Lesson.__table__, (
+            {"course_id": offset + course + 1, "title": f"Bab {position + 1}: {rng.choice(TOPICS)}",
+             "position": (position + 1) * lesson_order.LESSON_POSITION_GAP}
+            for course in range(courses) for position in range(lessons)
+        ))
+        _insert(db, models.Enrollment.__table__, (
+            {"user_id": first_student_id + user, "course_id": offset + course + 1}
+            for user, course in _unique_pairs(rng, students, courses, enrollments)
+        ))
+        _insert(db, models.Favorite.__table__, (
+            {"user_id": first_student_id + user, "course_id": offset + course + 1}
+            for user, course in _unique_pairs(rng, students, courses, favorites)
+        ))
+        db.execute(text(
+            "UPDATE courses SET enrollment_count = "
+            "(SELECT COUNT(*) FROM enrollments WHERE enrollments.course_id = courses.id)"
+        ))
+        db.commit()
+        analytics.backfill(db)
+        fulltext.rebuild(db)
+        db.execute(text("ANALYZE"))
+        db.commit()
+    finally:
+        db.close()
+
+    return {
+        "courses": courses, "lessons_per_course": lessons, "students": students,
+        "instructors": instructors, "enrollments": min(enrollments, students * courses),
+        "favorites": min(favorites, students * courses), "seed": seed,
+        "generate_seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--lessons", type=int, default=20, help="lesson per kursus")
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--instructors", type=int, default=100)
+    parser.add_argument("--enrollments", type=int, default=50_000)
+    parser.add_argument("--favorites", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def generate_from_args(args) -> dict:
+    return generate(courses=args.courses, lessons=args.lessons, students=args.students,
+                    instructors=args.instructors, enrollments=args.enrollments,
+                    favorites=args.favorites, seed=args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.dataset")
+    add_arguments(parser)
+    parser.add_argument("--output", help="salin database hasil ke file ini")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    _app.load_app()
+    summary = generate_from_args(args)
+    print(" ".join(f"{key}={value}" for key, value in summary.items()))
+
+    if args.output:
+        import sqlite3
+        from app import database
+
+        database.engine.dispose()
+        database.read_engine.dispose()
+        # Backup API SQLite: menghasilkan satu file utuh (termasuk isi WAL)
+        with sqlite3.connect(_app.database_path()) as source, sqlite3.connect(_app.user_path(args.output)) as target:
+            source.backup(target)
+        print(f"saved to {args.output}")
+
+    from app import hashing
+    hashing.pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
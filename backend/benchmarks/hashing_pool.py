@@ -0,0 +1,77 @@
+"""
+Benchmark login per detik untuk beberapa ukuran pool bcrypt.
+
+    python -m benchmarks.hashing_pool --sizes 1 2 4 8 --concurrency 32 --duration 5
+
+Setiap ukuran pool dijalankan dengan sejumlah klien login bersamaan terhadap
+aplikasi in-process (ASGI). Respons 503 (antrean penuh) dihitung terpisah.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks import _app
+
+PASSWORD = "benchmark-password"
+
+
+async def _run_clients(app, concurrency: int, duration: float):
+    import httpx
+
+    counts = {"ok": 0, "rejected": 0, "failed": 0}
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def client_loop():
+            while time.perf_counter() < deadline:
+                response = await client.post("/login", data={"username": "bench", "password": PASSWORD})
+                if response.status_code == 200:
+                    counts["ok"] += 1
+                elif response.status_code == 503:
+                    counts["rejected"] += 1
+                else:
+                    counts["failed"] += 1
+
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.hashing_pool")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--kind", choices=["thread", "process"], default="thread")
+    parser.add_argument("--queue-limit", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--rounds", type=int, default=None, help="BCRYPT_ROUNDS (default: nilai aplikasi)")
+    args = parser.parse_args(argv)
+
+    if args.rounds is not None:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+    app = _app.load_app()
+    from app import hashing, models
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    db.add(models.User(name="Bench", username="bench", email="bench@example.com",
+                       hashed_password=hashing.hash_password(PASSWORD)))
+    db.commit()
+    db.close()
+
+    print(f"bcrypt rounds={hashing.BCRYPT_ROUNDS} kind={args.kind} queue_limit={args.queue_limit} "
+          f"concurrency={args.concurrency} duration={args.duration}s")
+    print(f"{'pool':>5} {'logins/s':>10} {'ok':>8} {'503':>8} {'other':>8}")
+    for size in args.sizes:
+        hashing.configure_pool(size=size, queue_limit=args.queue_limit, kind=args.kind)
+        started = time.perf_counter()
+        counts = asyncio.run(_run_clients(app, args.concurrency, args.duration))
+        elapsed = time.perf_counter() - started
+        print(f"{size:>5} {counts['ok'] / elapsed:>10.1f} {counts['ok']:>8} {counts['rejected']:>8} {counts['failed']:>8}")
+
+    hashing.pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark ukuran respons dan biaya serialisasi untuk GET /courses/?limit=50.
+
+    python -m benchmarks.json_payload --courses 200 --lessons 20 --iterations 200
+
+Bagian 1 membandingkan byte yang dikirim untuk identity, gzip, dan br (jika paket
+brotli terpasang) melalui CompressionMiddleware.
+Bagian 2 mengukur waktu CPU per respons untuk beberapa cara serialisasi halaman
+yang sama (50 kursus beserta kategori dan daftar lesson-nya):
+  - jsonable_encoder + json.dumps  (jalur lama FastAPI tanpa response_model)
+  - model_dump + orjson            (FastJSONResponse)
+  - TypeAdapter.dump_json          (jalur cepat response_model / cache.cached_json)
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks import _app
+
+
+def _seed(course_count: int, lesson_count: int):
+    from app import hashing, lesson_order, models
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    user = models.User(name="Bench", username="bench", email="bench@example.com",
+                       hashed_password=hashing.hash_password("benchmark-password"),
+                       role=models.UserRole.instruktur)
+    db.add(user)
+    db.flush()
+    for index in range(course_count):
+        course = models.Course(
+            title=f"Kursus benchmark {index}",
+            description="Deskripsi kursus yang cukup panjang untuk mewakili data asli. " * 3,
+            category_id=index % 5 + 1, instruktur_id=user.id,
+        )
+        course.lessons = [
+            models.Lesson(title=f"Pelajaran {position + 1}: materi kursus {index}",
+                          position=(position + 1) * lesson_order.LESSON_POSITION_GAP)
+            for position in range(lesson_count)
+        ]
+        db.add(course)
+    db.commit()
+    db.close()
+
+
+def _cpu_per_call(function, iterations: int) -> float:
+    started = time.process_time()
+    for _ in range(iterations):
+        function()
+    return (time.process_time() - started) / iterations * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.json_payload")
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--lessons", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    app = _app.load_app()
+    _seed(args.courses, args.lessons)
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.testclient import TestClient
+    from app import cache, compression, hashing, responses, schemas
+    from app.database import SessionLocal
+    from app.routers import courses
+
+    path = "/courses/?limit=50"
+    print(f"== bytes on the wire: GET {path} ({args.lessons} lessons per course)")
+    encodings = ["identity", "gzip"] + (["br"] if compression.brotli is not None else [])
+    with TestClient(app) as client:
+        for encoding in encodings:
+            response = client.get(path, headers={"Accept-Encoding": encoding})
+            wire_bytes = len(response.content) if encoding == "identity" else int(response.headers["content-length"])
+            print(f"{encoding:>9}: {wire_bytes:>9} bytes  (content-encoding: "
+                  f"{response.headers.get('content-encoding', '-')})")
+    if compression.brotli is None:
+        print("       br: skipped (brotli package not installed)")
+
+    db = SessionLocal()
+    page = courses._list_courses(db, None, None, 1, 50, None, "page", False)
+    validated = cache.validate(schemas.PaginatedCourseDisplay, page)
+    adapter = cache._adapter_for(schemas.PaginatedCourseDisplay)
+    fast_response = responses.FastJSONResponse
+
+    print(f"\n== serialization CPU per response ({args.iterations} iterations)")
+    candidates = [
+        ("jsonable_encoder + json.dumps", lambda: json.dumps(jsonable_encoder(validated)).encode()),
+        ("model_dump + FastJSONResponse", lambda: fast_response(validated.model_dump(mode="json")).body),
+        ("TypeAdapter.dump_json", lambda: adapter.dump_json(validated)),
+    ]
+    for label, function in candidates:
+        print(f"{label:>30}: {_cpu_per_call(function, args.iterations):8.3f} ms")
+
+    body = adapter.dump_json(validated)
+    print(f"\n== compression CPU per response ({len(body)} bytes)")
+    for encoding in encodings[1:]:
+        def compress():
+            compressor = compression._Compressor(encoding)
+            return compressor.compress(body) + compressor.flush()
+        print(f"{encoding:>30}: {_cpu_per_call(compress, args.iterations):8.3f} ms")
+
+    db.close()
+    hashing.pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Load test in-process (ASGI) untuk skenario di benchmarks/scenarios.py.
+
+    python -m benchmarks.load --scenarios browse search login enroll reorder \\
+        --concurrency 16 --duration 10 --output results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.load --dataset big.db --baseline results/abc123.json
+
+Dataset dibuat oleh benchmarks.dataset (argumen --courses, --lessons, --enrollments, ...),
+atau disalin dari file --dataset. Setiap skenario dijalankan terpisah selama --duration
+detik dengan --concurrency klien. Laporan per skenario dan per langkah: jumlah request,
+throughput, p50/p95/p99/max, jumlah respons tak terduga, dan peak RSS proses.
+--output menyimpan hasil sebagai JSON (beserta commit git dan konfigurasinya);
+--baseline membandingkan hasil dengan file JSON dari run sebelumnya.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks import _app, dataset
+
+
+def _percentile(samples, percent):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss dalam KiB di Linux, byte di macOS; nilainya puncak sejak proses mulai
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _summarize(samples, errors: int, elapsed: float) -> dict:
+    millis = [sample * 1000 for sample in samples]
+    return {
+        "requests": len(millis),
+        "errors": errors,
+        "throughput_rps": round(len(millis) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(millis, 50), 3),
+        "p95_ms": round(_percentile(millis, 95), 3),
+        "p99_ms": round(_percentile(millis, 99), 3),
+        "max_ms": round(max(millis), 3) if millis else 0.0,
+    }
+
+
+async def _run_scenario(app, scenario, summary: dict, concurrency: int, duration: float, seed: int):
+    import httpx
+    from benchmarks.scenarios import Context
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                 timeout=None) as client:
+        ctx = Context(client, summary, seed)
+        deadline = time.perf_counter() + duration
+
+        async def worker_loop(worker):
+            while time.perf_counter() < deadline:
+                await scenario(ctx, worker)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker_loop(worker) for worker in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    every_sample = [sample for samples in ctx.samples.values() for sample in samples]
+    result = _summarize(every_sample, sum(ctx.errors.values()), elapsed)
+    result["steps"] = {
+        label: _summarize(samples, ctx.errors.get(label, 0), elapsed)
+        for label, samples in sorted(ctx.samples.items())
+    }
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=_app.BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_row(label, result):
+    print(f"{label:<22} {result['requests']:>8} {result['throughput_rps']:>9.1f} {result['p50_ms']:>8.2f} "
+          f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['max_ms']:>9.2f} {result['errors']:>6}")
+
+
+def _compare(results: dict, baseline: dict):
+    print(f"\n== compared with {baseline['meta'].get('commit') or 'baseline'} "
+          f"(latency: negative is faster; req/s: positive is better)")
+    print(f"{'scenario':<22} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, result in results.items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+
+        def delta(key):
+            old, new = previous[key], result[key]
+            return f"{(new - old) / old * 100:+8.1f}%" if old else "      n/a"
+
+        print(f"{name:<22} {delta('throughput_rps')} {delta('p50_ms')} {delta('p95_ms')} {delta('p99_ms')}")
+
+
+def main(argv=None):
+    from benchmarks.scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--dataset", help="file database dari `benchmarks.dataset --output`")
+    parser.add_argument("--output", help="simpan hasil sebagai JSON")
+    parser.add_argument("--baseline", help="file JSON hasil run sebelumnya untuk dibandingkan")
+    dataset.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    if args.dataset:
+        _app.use_dataset(args.dataset)
+    app = _app.load_app()
+    from app import hashing
+    from app.database import DB_ASYNC, SessionLocal
+
+    if args.dataset:
+        from sqlalchemy import text
+
+        db = SessionLocal()
+        try:
+            count = lambda sql: db.execute(text(sql)).scalar_one()
+            summary = {
+                "courses": count("SELECT COUNT(*) FROM courses"),
+                "lessons": count("SELECT COUNT(*) FROM lessons"),
+                "students": count("SELECT COUNT(*) FROM users WHERE role = 'siswa'"),
+                "instructors": count("SELECT COUNT(*) FROM users WHERE role = 'instruktur'"),
+                "enrollments": count("SELECT COUNT(*) FROM enrollments"),
+                "favorites": count("SELECT COUNT(*) FROM favorites"),
+                "source": args.dataset,
+            }
+        finally:
+            db.close()
+    else:
+        summary = dataset.generate_from_args(args)
+    print("dataset: " + " ".join(f"{key}={value}" for key, value in summary.items()))
+    print(f"concurrency={args.concurrency} duration={args.duration}s bcrypt_rounds={hashing.BCRYPT_ROUNDS} "
+          f"db_async={DB_ASYNC}")
+    print(f"\n{'scenario / step':<22} {'requests':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>9} {'errors':>6}")
+
+    results = {}
+    for name in args.scenarios:
+        result = asyncio.run(_run_scenario(app, SCENARIOS[name], summary, args.concurrency,
+                                           args.duration, args.seed))
+        results[name] = result
+        _print_row(name, result)
+        for label, step in result["steps"].items():
+            _print_row(f"  {label.split(':', 1)[1]}", step)
+        print(f"{'':<22} peak RSS {result['peak_rss_mb']} MB")
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "bcrypt_rounds": hashing.BCRYPT_ROUNDS,
+            "db_async": DB_ASYNC,
+            "dataset": summary,
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        output = _app.user_path(args.output)
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\nsaved to {args.output}")
+    if args.baseline:
+        with open(_app.user_path(args.baseline)) as handle:
+            _compare(results, json.load(handle))
+
+    hashing.pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
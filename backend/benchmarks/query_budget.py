@@ -0,0 +1,130 @@
+"""
+Cek anggaran query SQL per route (deteksi N+1 sebelum sampai produksi).
+
+    python -m benchmarks.query_budget --courses 30 --lessons 10
+
+Mengisi database sementara, memanggil setiap route di ROUTE_BUDGETS lewat
+TestClient di dalam querystats.query_budget, dan keluar dengan kode 1 bila ada
+route yang melewati anggarannya. Jumlah query tidak boleh bergantung pada
+jumlah data: jalankan dengan --courses/--lessons yang berbeda untuk memastikannya.
+Anggaran yang sama dijalankan oleh pytest di tests/test_query_budget.py.
+Cache respons dan cache principal dikosongkan sebelum setiap request agar yang
+diukur jalur database terburuk (route dengan login termasuk satu query user).
+"""
+import argparse
+import os
+import sys
+
+from benchmarks import _app
+
+# (method, path, anggaran query, perlu login sebagai)
+ROUTE_BUDGETS = [
+    ("GET", "/courses/?limit=50", 3, None),
+    ("GET", "/courses/?limit=50&fields=id,title,thumbnail_url", 2, None),
+    ("GET", "/courses/?limit=50&paginate=cursor", 2, None),
+    ("GET", "/courses/?search=kursus&limit=20", 4, None),
+    ("GET", "/courses/featured", 3, None),
+    ("GET", "/courses/1", 2, None),
+    ("GET", "/courses/1/lessons", 1, None),
+    ("GET", "/courses/my-courses", 3, "instructor"),
+    ("GET", "/lessons/1", 2, "instructor"),
+    ("GET", "/lessons/1", 3, "student"),
+    ("GET", "/my-enrollments", 3, "student"),
+    ("GET", "/favorites", 3, "student"),
+    ("GET", "/categories/", 1, None),
+]
+
+
+def _seed(course_count: int, lesson_count: int):
+    from app import fulltext, hashing, lesson_order, models
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    instructor = models.User(name="Budget", username="budget", email="budget@example.com",
+                             hashed_password=hashing.hash_password("benchmark-password"),
+                             role=models.UserRole.instruktur)
+    student = models.User(name="Siswa", username="siswa", email="siswa@example.com",
+                          hashed_password=hashing.hash_password("benchmark-password"))
+    db.add_all([instructor, student])
+    db.flush()
+    for index in range(course_count):
+        course = models.Course(title=f"Kursus anggaran {index}", description="Deskripsi kursus.",
+                               category_id=index % 5 + 1, instruktur_id=instructor.id, enrollment_count=1)
+        course.lessons = [
+            models.Lesson(title=f"Pelajaran {position + 1}",
+                          position=(position + 1) * lesson_order.LESSON_POSITION_GAP)
+            for position in range(lesson_count)
+        ]
+        db.add(course)
+        db.flush()
+        db.add(models.Enrollment(user_id=student.id, course_id=course.id))
+        db.add(models.Favorite(user_id=student.id, course_id=course.id))
+    fulltext.rebuild(db)
+    db.commit()
+    db.close()
+
+
+def route_label(method: str, path: str, role) -> str:
+    return f"{method} {path}" + (f" ({role})" if role else "")
+
+
+def login_headers(client) -> dict:
+    headers = {}
+    for role, username in (("instructor", "budget"), ("student", "siswa")):
+        token = client.post("/login", data={"username": username, "password": "benchmark-password"}).json()
+        headers[role] = {"Authorization": f"Bearer {token['access_token']}"}
+    return headers
+
+
+def measure(client, headers: dict, method: str, path: str, budget: int, role):
+    """
+    Memanggil satu route di dalam querystats.query_budget. Mengembalikan
+    (stats, response, error); `error` berisi AssertionError jika melewati anggaran.
+    """
+    from app import cache, oauth2, querystats
+
+    cache.response_cache.clear()
+    oauth2._principal_cache.clear()
+    try:
+        with querystats.query_budget(budget, route_label(method, path, role)) as stats:
+            response = client.request(method, path, headers=headers.get(role))
+    except AssertionError as error:
+        return stats, response, error
+    return stats, response, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.query_budget")
+    parser.add_argument("--courses", type=int, default=30)
+    parser.add_argument("--lessons", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    app = _app.load_app()
+    _seed(args.courses, args.lessons)
+
+    from fastapi.testclient import TestClient
+    from app import hashing
+
+    failures = 0
+    with TestClient(app) as client:
+        headers = login_headers(client)
+
+        for method, path, budget, role in ROUTE_BUDGETS:
+            stats, response, error = measure(client, headers, method, path, budget, role)
+            status = "ok"
+            if error is not None:
+                failures += 1
+                status = "OVER BUDGET"
+                print(error, file=sys.stderr)
+            print(f"{route_label(method, path, role):>60}: {stats.count:>3} / {budget} queries  "
+                  f"[{response.status_code}] {status}")
+
+    hashing.pool.shutdown()
+    if failures:
+        print(f"\n{failures} route(s) over budget", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
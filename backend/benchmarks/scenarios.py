@@ -0,0 +1,114 @@
+"""
+Skenario beban untuk benchmarks.load. Setiap skenario adalah coroutine
+`scenario(ctx, worker)` yang menjalankan satu iterasi (beberapa request) dan
+mencatat latensi tiap request lewat `ctx.request(...)` dengan label
+"<skenario>:<langkah>", sehingga laporan bisa dipecah per endpoint.
+"""
+import random
+import time
+
+from benchmarks import dataset
+
+
+class Context:
+    def __init__(self, client, summary: dict, seed: int):
+        from app.jwt import create_access_token
+
+        self.client = client
+        self.summary = summary
+        self.rng = random.Random(seed)
+        self.samples = {}   # label -> [detik]
+        self.errors = {}    # label -> jumlah respons tak terduga
+        self.course_count = summary["courses"]
+        self.student_count = summary["students"]
+        self.instructor_count = summary["instructors"]
+        self._create_token = create_access_token
+        self._tokens = {}
+
+    def token_headers(self, username: str) -> dict:
+        # Token dibuat langsung (tanpa bcrypt) agar skenario selain login tidak ikut mengukur hashing
+        headers = self._tokens.get(username)
+        if headers is None:
+            from app import models
+            from app.database import SessionLocal
+
+            db = SessionLocal()
+            try:
+                user = db.query(models.User).filter(models.User.username == username).one()
+                token = self._create_token({"sub": user.email, "role": user.role.value, "uid": user.id})
+            finally:
+                db.close()
+            headers = self._tokens[username] = {"Authorization": f"Bearer {token}"}
+        return headers
+
+    def random_course_id(self) -> int:
+        return self.rng.randint(1, self.course_count)
+
+    def random_student(self) -> str:
+        return dataset.student_username(self.rng.randrange(self.student_count))
+
+    def instructor_of(self, course_id: int) -> str:
+        # Sesuai pembagian di dataset.generate: kursus ke-i milik instruktur i % instructors
+        return dataset.instructor_username((course_id - 1) % self.instructor_count)
+
+    async def request(self, label: str, method: str, path: str, expected=(200,), **kwargs):
+        started = time.perf_counter()
+        response = await self.client.request(method, path, **kwargs)
+        self.samples.setdefault(label, []).append(time.perf_counter() - started)
+        if response.status_code not in expected:
+            self.errors[label] = self.errors.get(label, 0) + 1
+        return response
+
+
+async def browse(ctx: Context, worker: int):
+    pages = max(1, ctx.course_count // 12)
+    await ctx.request("browse:list", "GET", f"/courses/?page={ctx.rng.randint(1, min(pages, 50))}&limit=12")
+    course_id = ctx.random_course_id()
+    await ctx.request("browse:detail", "GET", f"/courses/{course_id}")
+    await ctx.request("browse:lessons", "GET", f"/courses/{course_id}/lessons")
+
+
+async def search(ctx: Context, worker: int):
+    term = ctx.rng.choice(dataset.TOPICS)
+    if ctx.rng.random() < 0.5:
+        term = f"{term} {ctx.rng.choice(dataset.LEVELS)}"
+    await ctx.request("search:query", "GET", "/courses/", params={"search": term, "limit": 12})
+
+
+async def login(ctx: Context, worker: int):
+    await ctx.request("login:password", "POST", "/login",
+                      data={"username": ctx.random_student(), "password": dataset.PASSWORD})
+
+
+async def enroll(ctx: Context, worker: int):
+    # Daftar lalu batal, agar dataset tetap sama untuk iterasi berikutnya.
+    # 400 = sudah terdaftar sebelumnya (dari dataset)
+    headers = ctx.token_headers(ctx.random_student())
+    course_id = ctx.random_course_id()
+    response = await ctx.request("enroll:enroll", "POST", f"/courses/{course_id}/enroll",
+                                 expected=(201, 400), headers=headers)
+    if response.status_code == 201:
+        await ctx.request("enroll:unenroll", "DELETE", f"/enrollments/{course_id}",
+                          expected=(204,), headers=headers)
+
+
+async def reorder(ctx: Context, worker: int):
+    course_id = ctx.random_course_id()
+    headers = ctx.token_headers(ctx.instructor_of(course_id))
+    response = await ctx.request("reorder:lessons", "GET", f"/courses/{course_id}/lessons")
+    lesson_ids = [lesson["id"] for lesson in response.json()]
+    if not lesson_ids:
+        return
+    # Pindahkan lesson terakhir ke depan (satu lesson), lalu balik urutan seluruhnya
+    await ctx.request("reorder:move", "PATCH", f"/lessons/{lesson_ids[-1]}", json={"order": 1}, headers=headers)
+    await ctx.request("reorder:order", "PUT", f"/courses/{course_id}/lessons/order",
+                      json={"lesson_ids": list(reversed(lesson_ids))}, headers=headers)
+
+
+SCENARIOS = {
+    "browse": browse,
+    "search": search,
+    "login": login,
+    "enroll": enroll,
+    "reorder": reorder,
+}
@@ -0,0 +1,122 @@
+"""
+Benchmark latensi baca katalog selama ada upload thumbnail yang berjalan.
+
+    python -m benchmarks.upload_latency --readers 16 --uploaders 4 --upload-mb 4 --duration 5
+
+Dua fase dijalankan terhadap aplikasi in-process (ASGI) yang sama:
+  1. hanya pembaca  (GET /courses/ dan GET /courses/{id})
+  2. pembaca + pengunggah (PATCH /courses/{id} dengan file berukuran --upload-mb)
+Jika penyimpanan file tidak memblokir event loop, p95/p99 pembaca di fase 2
+tetap mendekati fase 1.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks import _app
+
+PASSWORD = "benchmark-password"
+
+
+def _percentile(samples, percent):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _run_phase(app, token, course_ids, readers, uploaders, upload_bytes, duration):
+    import httpx
+
+    latencies = []
+    uploads = {"ok": 0, "failed": 0}
+    deadline = time.perf_counter() + duration
+    headers = {"Authorization": f"Bearer {token}"}
+    payload = os.urandom(upload_bytes)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                 timeout=None) as client:
+        async def reader_loop(worker):
+            index = worker
+            while time.perf_counter() < deadline:
+                course_id = course_ids[index % len(course_ids)]
+                index += 1
+                path = "/courses/?limit=20" if index % 2 else f"/courses/{course_id}"
+                started = time.perf_counter()
+                await client.get(path)
+                latencies.append(time.perf_counter() - started)
+
+        async def uploader_loop(worker):
+            course_id = course_ids[worker % len(course_ids)]
+            while time.perf_counter() < deadline:
+                response = await client.patch(
+                    f"/courses/{course_id}", headers=headers,
+                    files={"file": ("bench.jpg", payload, "image/jpeg")},
+                )
+                uploads["ok" if response.status_code == 200 else "failed"] += 1
+
+        tasks = [reader_loop(worker) for worker in range(readers)]
+        tasks += [uploader_loop(worker) for worker in range(uploaders)]
+        await asyncio.gather(*tasks)
+
+    return latencies, uploads
+
+
+def _report(label, latencies, uploads, duration):
+    millis = [latency * 1000 for latency in latencies]
+    print(f"{label:<18} {len(millis) / duration:>9.1f} "
+          f"{statistics.median(millis) if millis else 0:>8.2f} "
+          f"{_percentile(millis, 95):>8.2f} {_percentile(millis, 99):>8.2f} "
+          f"{max(millis) if millis else 0:>8.2f} {uploads['ok']:>8} {uploads['failed']:>7}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.upload_latency")
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--uploaders", type=int, default=4)
+    parser.add_argument("--upload-mb", type=float, default=4.0)
+    parser.add_argument("--courses", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    upload_bytes = int(args.upload_mb * 1024 * 1024)
+    # Batas ukuran upload harus cukup untuk file benchmark
+    os.environ.setdefault("THUMBNAIL_MAX_BYTES", str(upload_bytes + 1024))
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+    app = _app.load_app()
+    from app import hashing, models
+    from app.database import SessionLocal
+    from app.jwt import create_access_token
+
+    db = SessionLocal()
+    user = models.User(name="Bench", username="bench", email="bench@example.com",
+                       hashed_password=hashing.hash_password(PASSWORD), role=models.UserRole.instruktur)
+    db.add(user)
+    db.flush()
+    courses = [models.Course(title=f"Kursus {i}", description="Deskripsi kursus benchmark",
+                             category_id=1, instruktur_id=user.id) for i in range(args.courses)]
+    db.add_all(courses)
+    db.commit()
+    course_ids = [course.id for course in courses]
+    token = create_access_token(data={"sub": user.email, "role": user.role.value, "uid": user.id})
+    db.close()
+
+    print(f"readers={args.readers} uploaders={args.uploaders} upload={args.upload_mb}MB "
+          f"duration={args.duration}s")
+    print(f"{'phase':<18} {'reads/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+          f"{'uploads':>8} {'failed':>7}")
+    for label, uploaders in (("reads only", 0), ("reads + uploads", args.uploaders)):
+        latencies, uploads = asyncio.run(_run_phase(
+            app, token, course_ids, args.readers, uploaders, upload_bytes, args.duration
+        ))
+        _report(label, latencies, uploads, args.duration)
+
+    hashing.pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Validasi rentang GET /analytics/courses: rentang di ujung kalender tidak boleh 500,
+dan rentang yang terlalu panjang ditolak sebelum daftar periodenya dibuat.
+"""
+import os
+from datetime import date
+
+import pytest
+
+# benchmarks._app harus diimpor sebelum modul `app` mana pun (database di folder sementara)
+from benchmarks import _app
+
+
+@pytest.fixture(scope="module")
+def instructor_client():
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    app = _app.load_app()
+
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        client.post("/users/register", json={"name": "Analitik", "username": "analitik",
+                                             "email": "analitik@example.com", "password": "password1"})
+        token = client.post("/login", data={"username": "analitik", "password": "password1"}).json()
+        token = client.post("/users/become-instructor",
+                            headers={"Authorization": f"Bearer {token['access_token']}"}).json()
+        yield client, {"Authorization": f"Bearer {token['access_token']}"}
+
+
+@pytest.mark.parametrize("interval, expected", [("day", 12), ("week", 2), ("month", 1)])
+def test_periods_stop_before_date_max(interval, expected):
+    from app import analytics
+
+    start, end = date(9999, 12, 20), date(9999, 12, 31)
+    assert len(analytics.periods(start, end, interval)) == expected
+    assert analytics.period_count(start, end, interval) == expected
+
+
+@pytest.mark.parametrize("interval", ["day", "week", "month"])
+def test_range_at_date_max(instructor_client, interval):
+    client, headers = instructor_client
+    response = client.get("/analytics/courses", headers=headers,
+                          params={"start": "9999-12-20", "end": "9999-12-31", "interval": interval})
+    assert response.status_code == 200, response.text
+
+
+def test_oversized_range_rejected_without_building_periods(instructor_client, monkeypatch):
+    from app import analytics
+
+    def fail(*args):
+        raise AssertionError("periods() called for a range over MAX_PERIODS")
+
+    monkeypatch.setattr(analytics, "periods", fail)
+    client, headers = instructor_client
+    response = client.get("/analytics/courses", headers=headers,
+                          params={"start": "0001-01-01", "end": "9999-12-31", "interval": "day"})
+    assert response.status_code == 400
+
+
+def test_default_start_near_date_min(instructor_client):
+    client, headers = instructor_client
+    response = client.get("/analytics/courses", headers=headers, params={"end": "0001-01-05"})
+    assert response.status_code == 200, response.text
+    assert response.json()["start"] == "0001-01-01"
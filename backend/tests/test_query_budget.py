@@ -0,0 +1,37 @@
+"""
+Anggaran query per route (benchmarks/query_budget.py) sebagai test, agar CI gagal
+bila ada route yang melewati anggarannya (mis. N+1 baru). Jalankan dari folder backend:
+
+    python -m pytest -q
+"""
+import os
+
+import pytest
+
+# benchmarks._app harus diimpor sebelum modul `app` mana pun (database di folder sementara)
+from benchmarks import _app, query_budget
+
+
+@pytest.fixture(scope="module")
+def budget_client():
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    app = _app.load_app()
+    query_budget._seed(course_count=30, lesson_count=10)
+
+    from fastapi.testclient import TestClient
+    from app import hashing
+
+    with TestClient(app) as client:
+        yield client, query_budget.login_headers(client)
+    hashing.pool.shutdown()
+
+
+@pytest.mark.parametrize(
+    "method, path, budget, role", query_budget.ROUTE_BUDGETS,
+    ids=[query_budget.route_label(method, path, role) for method, path, _, role in query_budget.ROUTE_BUDGETS]
+)
+def test_route_within_query_budget(budget_client, method, path, budget, role):
+    client, headers = budget_client
+    stats, response, error = query_budget.measure(client, headers, method, path, budget, role)
+    assert error is None, str(error)
+    assert response.status_code == 200, response.text
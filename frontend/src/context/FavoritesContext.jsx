@@ -16,8 +16,17 @@ export function FavoritesProvider({ children }) {
       return;
     }
     try {
-      const response = await api.get('/favorites');
-      const ids = response.data.map(favCourse => favCourse.id);
+      // Hanya id yang dibutuhkan, jadi minta field id saja (bukan CourseDisplay lengkap),
+      // per halaman cursor agar setiap request tetap kecil
+      const ids = [];
+      let cursor = null;
+      do {
+        const response = await api.get('/favorites', {
+          params: { fields: 'id', paginate: 'cursor', limit: 100, ...(cursor && { cursor }) }
+        });
+        ids.push(...response.data.results.map(favCourse => favCourse.id));
+        cursor = response.data.next_cursor;
+      } while (cursor);
       setFavoriteIds(new Set(ids));
     } catch (error) {
       console.error("Gagal memuat data favorit:", error);
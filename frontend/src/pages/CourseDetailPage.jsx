@@ -35,11 +35,11 @@ export function CourseDetailPage() {
           if (user.id === courseData.instruktur_id) {
             setIsOwner(true);
           } else {
-            const enrollmentsResponse = await api.get('/my-enrollments');
-            const isUserEnrolled = enrollmentsResponse.data.some(
-              (enrollment) => enrollment.course.id === parseInt(courseId)
-            );
-            setIsEnrolled(isUserEnrolled);
+            // Cukup status kursus ini, bukan seluruh daftar /my-enrollments
+            const statusResponse = await api.get('/my-course-status', {
+              params: { course_ids: courseId },
+            });
+            setIsEnrolled(statusResponse.data[0]?.enrolled ?? false);
           }
         }
       } catch (err) {
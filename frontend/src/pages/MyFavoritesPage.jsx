@@ -3,15 +3,24 @@ import { Link } from 'react-router-dom';
 import api from '../services/api';
 import { CourseCard } from '../components/CourseCard';
 
+const PAGE_SIZE = 20;
+
+// Per halaman (cursor), favorit terbaru lebih dulu
+const fetchFavoritePage = (cursor) =>
+  api.get('/favorites', { params: { paginate: 'cursor', limit: PAGE_SIZE, ...(cursor && { cursor }) } });
+
 export function MyFavoritesPage() {
   const [favoriteCourses, setFavoriteCourses] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     const fetchFavorites = async () => {
       try {
-        const response = await api.get('/favorites');
-        setFavoriteCourses(response.data);
+        const response = await fetchFavoritePage();
+        setFavoriteCourses(response.data.results);
+        setNextCursor(response.data.next_cursor);
       } catch (error) {
         console.error("Gagal memuat favorit:", error);
       } finally {
@@ -21,6 +30,19 @@ export function MyFavoritesPage() {
     fetchFavorites();
   }, []);
 
+  const handleLoadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await fetchFavoritePage(nextCursor);
+      setFavoriteCourses(prev => [...prev, ...response.data.results]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error("Gagal memuat favorit berikutnya:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return (
       <div className="min-h-screen flex items-center justify-center bg-gradient-to-br from-indigo-900 via-slate-800 to-gray-900 text-white">
@@ -35,11 +57,24 @@ export function MyFavoritesPage() {
         <h1 className="text-3xl font-semibold mb-8">Kursus Favorit Saya</h1>
 
         {favoriteCourses.length > 0 ? (
+          <>
           <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
             {favoriteCourses.map(course => (
               <CourseCard key={course.id} course={course} />
             ))}
           </div>
+          {nextCursor && (
+            <div className="flex justify-center mt-8">
+              <button
+                onClick={handleLoadMore}
+                disabled={loadingMore}
+                className="bg-indigo-500 hover:bg-indigo-600 disabled:opacity-60 text-white px-6 py-2 rounded-xl transition"
+              >
+                {loadingMore ? 'Memuat...' : 'Muat lebih banyak'}
+              </button>
+            </div>
+          )}
+          </>
         ) : (
           <div className="text-center bg-white/10 backdrop-blur-md border border-white/20 p-10 rounded-xl">
             <h2 className="text-2xl font-semibold">Anda belum memiliki kursus favorit.</h2>
@@ -12,8 +12,12 @@ function HeartIcon({ isFavorited }) {
   );
 }
 
+const PAGE_SIZE = 20;
+
 export function MyLearningPage() {
   const [enrolledCourses, setEnrolledCourses] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -24,12 +28,19 @@ export function MyLearningPage() {
     fetchMyLearningData();
   }, []);
 
+  // Per halaman (cursor), terbaru lebih dulu: ukuran respons tidak bergantung pada jumlah kursus yang diikuti
+  const fetchEnrollmentPage = async (cursor) => {
+    const response = await api.get('/my-enrollments', {
+      params: { paginate: 'cursor', limit: PAGE_SIZE, ...(cursor && { cursor }) }
+    });
+    setNextCursor(response.data.next_cursor);
+    return response.data.results.map(enrollment => enrollment.course);
+  };
+
   const fetchMyLearningData = async () => {
     try {
       setLoading(true);
-      const response = await api.get('/my-enrollments');
-      const courses = response.data.map(enrollment => enrollment.course);
-      setEnrolledCourses(courses);
+      setEnrolledCourses(await fetchEnrollmentPage());
     } catch (err) {
       setError('Gagal memuat kursus Anda.');
     } finally {
@@ -37,6 +48,18 @@ export function MyLearningPage() {
     }
   };
 
+  const handleLoadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const courses = await fetchEnrollmentPage(nextCursor);
+      setEnrolledCourses(prev => [...prev, ...courses]);
+    } catch {
+      alert('Gagal memuat kursus berikutnya.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleUnenroll = async (courseId, courseTitle) => {
     if (window.confirm(`Anda yakin ingin membatalkan pendaftaran dari kursus "${courseTitle}"?`)) {
       try {
@@ -79,6 +102,7 @@ export function MyLearningPage() {
         <h1 className="text-3xl font-semibold mb-8">Kursus yang Saya Ikuti</h1>
 
         {enrolledCourses.length > 0 ? (
+          <>
           <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
             {enrolledCourses.map(course => {
               const isFavorited = favoriteIds.has(course.id);
@@ -121,6 +145,18 @@ export function MyLearningPage() {
               );
             })}
           </div>
+          {nextCursor && (
+            <div className="flex justify-center mt-8">
+              <button
+                onClick={handleLoadMore}
+                disabled={loadingMore}
+                className="bg-indigo-500 hover:bg-indigo-600 disabled:opacity-60 text-white px-6 py-2 rounded-xl transition"
+              >
+                {loadingMore ? 'Memuat...' : 'Muat lebih banyak'}
+              </button>
+            </div>
+          )}
+          </>
         ) : (
           <div className="text-center bg-white/10 backdrop-blur-md border border-white/20 p-10 rounded-xl">
             <h2 className="text-2xl font-semibold">Anda belum mendaftar di kursus manapun.</h2>